@@ -5,6 +5,7 @@ import json
 from datetime import datetime
 import uuid
 import logging
+import threading
 from routes.businesses import business_bp
 from routes.appointments import appointment_bp
 from routes.services import services_bp
@@ -13,7 +14,10 @@ from routes.customers import customers_bp
 from routes.business_hours import business_hours_bp
 from routes.closed_dates import closed_dates_bp
 from routes.availability import availability_bp
-from services.database import DatabaseService
+from services.database import get_database_service
+from services.email_outbox import get_email_outbox, start_email_workers
+from services.qr_jobs import get_qr_job_queue, start_qr_worker
+from services.reminders import ReminderScheduler
 from config import Config
 
 # Configure logging
@@ -31,18 +35,39 @@ CORS(app,
 # Configure Flask to handle trailing slashes
 app.url_map.strict_slashes = False
 
-# Initialize database service
-try:
-    db_service = DatabaseService()
-    logger.info("Database service initialized successfully")
-except Exception as e:
-    logger.error(f"Failed to initialize database service: {e}")
-    db_service = None
-
 # Ensure data directory exists
 data_dir = os.path.join(os.path.dirname(__file__), 'data')
 os.makedirs(data_dir, exist_ok=True)
 
+def start_background_services():
+    """Connect to the database and start the email, QR code and reminder workers"""
+    # Initialize the database service shared with every blueprint
+    db_service = get_database_service()
+
+    # Start sending queued emails, including any left over from before a restart
+    try:
+        start_email_workers()
+    except Exception as e:
+        logger.error(f"Failed to start email outbox workers: {e}")
+
+    # Generate queued QR codes in the background
+    try:
+        start_qr_worker()
+    except Exception as e:
+        logger.error(f"Failed to start QR code worker: {e}")
+
+    # Queue reminder emails for upcoming appointments
+    if db_service and Config.REMINDER_INTERVAL_SECONDS > 0:
+        reminder_scheduler = ReminderScheduler(db_service.get_supabase_client(), Config.REMINDER_INTERVAL_SECONDS)
+        reminder_scheduler.start()
+
+if Config.FAST_START:
+    # Serve requests straight away and warm up in the background; a request
+    # needing the database before it is ready waits for the same connection
+    threading.Thread(target=start_background_services, name='warm-up', daemon=True).start()
+else:
+    start_background_services()
+
 # Register blueprints
 app.register_blueprint(business_bp, url_prefix='/api/businesses')
 app.register_blueprint(appointment_bp, url_prefix='/api/appointments')
@@ -79,18 +104,34 @@ def handle_preflight():
 @app.route('/api/health')
 def health_check():
     """Health check endpoint"""
+    db_service = get_database_service()
     db_status = "Connected" if db_service and db_service.test_connection() else "Disconnected"
     
+    try:
+        email_outbox = get_email_outbox().counts()
+    except Exception as e:
+        logger.error(f"Failed to read email outbox: {e}")
+        email_outbox = None
+    
+    try:
+        qr_jobs = get_qr_job_queue().counts()
+    except Exception as e:
+        logger.error(f"Failed to read QR job queue: {e}")
+        qr_jobs = None
+    
     return jsonify({
         'status': 'OK',
         'message': 'BookMyAppointment API is running',
         'database': db_status,
+        'email_outbox': email_outbox,
+        'qr_jobs': qr_jobs,
         'timestamp': datetime.now().isoformat()
     })
 
 @app.route('/api/migrate', methods=['POST'])
 def migrate_data():
     """Migrate data from JSON files to Supabase"""
+    db_service = get_database_service()
     if not db_service:
         return jsonify({'error': 'Database service not available'}), 500
     
@@ -104,6 +145,7 @@ def migrate_data():
 @app.route('/api/sample-data', methods=['POST'])
 def create_sample_data():
     """Create sample data for testing"""
+    db_service = get_database_service()
     if not db_service:
         return jsonify({'error': 'Database service not available'}), 500
     
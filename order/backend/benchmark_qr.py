@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark QR code rendering
+Compares the single-path SVG renderer with the previous one-<rect>-per-module
+SVG (size, gzipped size and render time) and times PNG output.
+
+    python benchmark_qr.py [--runs 200]
+"""
+
+import gzip
+import argparse
+import timeit
+from qrcodegen import QrCode
+from services.qr_render import qr_code_to_svg, qr_code_to_png
+
+SAMPLE_URLS = [
+    'http://localhost:5173/cuts',
+    'https://bookly.example.com/downtown-hair-and-beauty-studio',
+    'https://bookly.example.com/' + 'long-business-name-' * 6
+]
+
+PNG_SIZES = [128, 256, 512, 1024]
+
+def render_svg_rects(qr_code, scale=4):
+    """The previous renderer: one <rect> per dark module"""
+    size = qr_code.get_size()
+    svg_size = size * scale
+
+    svg_parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" version="1.1" viewBox="0 0 {svg_size} {svg_size}" stroke="none">',
+        f'<rect width="{svg_size}" height="{svg_size}" fill="white"/>'
+    ]
+
+    for y in range(size):
+        for x in range(size):
+            if qr_code.get_module(x, y):
+                svg_parts.append(
+                    f'<rect x="{x * scale}" y="{y * scale}" width="{scale}" height="{scale}" fill="black"/>'
+                )
+
+    svg_parts.append('</svg>')
+    return ''.join(svg_parts)
+
+def time_ms(func, runs, repeat=5):
+    """Milliseconds per call, best of repeat rounds of runs calls"""
+    return min(timeit.repeat(func, number=runs, repeat=repeat)) / runs * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark QR code rendering')
+    parser.add_argument('--runs', type=int, default=200, help='renders per measurement')
+    args = parser.parse_args()
+
+    print(f"{'modules':>7} {'renderer':<10} {'bytes':>8} {'gzip':>7} {'ms':>8}")
+    for url in SAMPLE_URLS:
+        qr_code = QrCode.encode_text(url, QrCode.Ecc.MEDIUM)
+        for name, render in (('rects', render_svg_rects), ('path', qr_code_to_svg)):
+            svg = render(qr_code).encode('utf-8')
+            elapsed = time_ms(lambda: render(qr_code), args.runs)
+            print(f"{qr_code.get_size():>7} {name:<10} {len(svg):>8} {len(gzip.compress(svg)):>7} {elapsed:>8.3f}")
+
+    print()
+    print(f"{'modules':>7} {'png size':<10} {'bytes':>8} {'ms':>8}")
+    qr_code = QrCode.encode_text(SAMPLE_URLS[1], QrCode.Ecc.MEDIUM)
+    for size in PNG_SIZES:
+        png = qr_code_to_png(qr_code, size)
+        elapsed = time_ms(lambda: qr_code_to_png(qr_code, size), max(1, args.runs // 4))
+        print(f"{qr_code.get_size():>7} {size:<10} {len(png):>8} {elapsed:>8.3f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark backend cold start
+Shows where the import time of app.py goes, then starts the server the way
+Render does (gunicorn, one worker) with and without FAST_START and measures
+how long the first responses take, like the first request after the host
+wakes up.
+
+The app starts exactly as in production, background workers included, so
+run this against a development .env.
+
+    python benchmark_startup.py [--runs 5] [--path /api/health] [--top 15]
+"""
+
+import os
+import sys
+import time
+import socket
+import argparse
+import statistics
+import subprocess
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def import_profile(fast_start):
+    """Return [(cumulative ms, module)] for app.py and everything it imports directly"""
+    env = dict(os.environ, FAST_START=str(fast_start))
+    # Background threads are not started: only the import itself is measured,
+    # and imports made by other threads would garble the nesting in the report
+    code = 'import os, threading; threading.Thread.start = lambda self: None; import app; os._exit(0)'
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not cumulative.strip().isdigit():
+            continue
+        # Nested imports are indented by two spaces per level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth <= 1:
+            rows.append((int(cumulative) / 1000, '  ' * depth + name.strip()))
+    return rows
+
+def free_port():
+    """A local port nothing is listening on"""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def wait_for(url, started, timeout):
+    """Poll url until the server answers; returns seconds since started"""
+    while time.monotonic() - started < timeout:
+        try:
+            requests.get(url, timeout=timeout)
+            return time.monotonic() - started
+        except requests.exceptions.ConnectionError:
+            time.sleep(0.01)
+    raise TimeoutError(f"{url} did not answer within {timeout}s")
+
+def time_cold_start(fast_start, path, timeout):
+    """Start the server; returns (seconds until / answers, seconds until path answers)"""
+    port = free_port()
+    env = dict(os.environ, FAST_START=str(fast_start), FLASK_ENV='production')
+    started = time.monotonic()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', 'app:app', '--bind', f'127.0.0.1:{port}', '--worker-class', 'gthread', '--threads', '32'],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        ready = wait_for(f'http://127.0.0.1:{port}/', started, timeout)
+        first = wait_for(f'http://127.0.0.1:{port}{path}', started, timeout)
+        return ready, first
+    finally:
+        server.terminate()
+        server.wait(10)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark backend cold start')
+    parser.add_argument('--runs', type=int, default=5, help='server starts per mode')
+    parser.add_argument('--path', default='/api/health', help='request timed after the server is up')
+    parser.add_argument('--top', type=int, default=15, help='slowest imports listed per mode')
+    parser.add_argument('--timeout', type=float, default=60, help='seconds to wait for the server')
+    args = parser.parse_args()
+
+    for fast_start in (False, True):
+        rows = sorted(import_profile(fast_start), reverse=True)
+        print(f"📦 Slowest imports of app.py with FAST_START={fast_start}")
+        for elapsed, name in rows[:args.top]:
+            print(f"{elapsed:>9.1f} ms  {name}")
+        print()
+
+    print(f"{'FAST_START':<11} {'ready ms':>9} {'first ' + args.path + ' ms':>24}")
+    for fast_start in (False, True):
+        results = [time_cold_start(fast_start, args.path, args.timeout) for _ in range(args.runs)]
+        ready = statistics.median(r[0] for r in results) * 1000
+        first = statistics.median(r[1] for r in results) * 1000
+        print(f"{str(fast_start):<11} {ready:>9.0f} {first:>24.0f}")
+
+if __name__ == '__main__':
+    main()
@@ -8,10 +8,95 @@ class Config:
     SUPABASE_URL = os.getenv('SUPABASE_URL')
     SUPABASE_KEY = os.getenv('SUPABASE_KEY')
     SUPABASE_SERVICE_KEY = os.getenv('SUPABASE_SERVICE_KEY')
+    # Timeouts for queries and for storage calls made through the shared Supabase
+    # client; the defaults are supabase-py's own
+    SUPABASE_TIMEOUT_SECONDS = float(os.getenv('SUPABASE_TIMEOUT_SECONDS', '5'))
+    SUPABASE_STORAGE_TIMEOUT_SECONDS = float(os.getenv('SUPABASE_STORAGE_TIMEOUT_SECONDS', '20'))
     
     # Flask Configuration
     FLASK_ENV = os.getenv('FLASK_ENV', 'development')
     FLASK_DEBUG = os.getenv('FLASK_DEBUG', 'True').lower() == 'true'
+    # Start serving before connecting to Supabase and starting the background
+    # workers, which then happens in a thread (for hosts that sleep when idle)
+    FAST_START = os.getenv('FAST_START', 'False').lower() == 'true'
+    
+    # Cache Configuration (TTLs in seconds, 0 disables caching)
+    CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'memory')  # 'memory' or 'redis'
+    REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', '1024'))
+    CACHE_TTL = int(os.getenv('CACHE_TTL', '300'))
+    BUSINESS_HOURS_CACHE_TTL = int(os.getenv('BUSINESS_HOURS_CACHE_TTL', '300'))
+    # Capped at ETAG_VERSION_TTL with the memory backend, whose invalidations stay in one worker
+    AVAILABILITY_CACHE_TTL = int(os.getenv('AVAILABILITY_CACHE_TTL', '900'))
+    AVAILABILITY_HORIZON_DAYS = int(os.getenv('AVAILABILITY_HORIZON_DAYS', '60'))
+    # Lifetime of ETag versions in the memory cache, which other workers cannot see
+    ETAG_VERSION_TTL = int(os.getenv('ETAG_VERSION_TTL', '30'))
+    
+    # How long a slot picked on the booking page is held for that customer
+    APPOINTMENT_HOLD_SECONDS = int(os.getenv('APPOINTMENT_HOLD_SECONDS', '600'))
+    # Unexpired holds one client (IP address) may have at once
+    APPOINTMENT_MAX_HOLDS_PER_CLIENT = int(os.getenv('APPOINTMENT_MAX_HOLDS_PER_CLIENT', '3'))
+    
+    # QR code images kept locally after the first download from storage
+    QR_CACHE_DIR = os.getenv('QR_CACHE_DIR', os.path.join(os.path.dirname(__file__), 'data', 'qr_codes'))
+    QR_CACHE_MAX_ENTRIES = int(os.getenv('QR_CACHE_MAX_ENTRIES', '256'))
+    # Seconds before a local copy is downloaded (or rendered) again
+    QR_CACHE_TTL = int(os.getenv('QR_CACHE_TTL', '3600'))
+    QR_PNG_DEFAULT_SIZE = int(os.getenv('QR_PNG_DEFAULT_SIZE', '256'))
+    # Only these ?size= values are rendered, so each business caches a few PNGs at most
+    QR_PNG_SIZES = [int(size) for size in os.getenv('QR_PNG_SIZES', '128,256,512,1024').split(',')]
+    
+    # Shared HTTP session for direct Supabase REST/storage calls
+    HTTP_POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', '4'))
+    HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', '10'))
+    HTTP_CONNECT_TIMEOUT_SECONDS = float(os.getenv('HTTP_CONNECT_TIMEOUT_SECONDS', '5'))
+    HTTP_READ_TIMEOUT_SECONDS = float(os.getenv('HTTP_READ_TIMEOUT_SECONDS', '30'))
+    HTTP_RETRIES = int(os.getenv('HTTP_RETRIES', '3'))
+    HTTP_RETRY_BACKOFF_SECONDS = float(os.getenv('HTTP_RETRY_BACKOFF_SECONDS', '0.5'))
+    
+    # Background QR code generation (delays in seconds)
+    QR_JOBS_PATH = os.getenv('QR_JOBS_PATH', os.path.join(os.path.dirname(__file__), 'data', 'qr_jobs.sqlite3'))
+    QR_JOB_POLL_SECONDS = int(os.getenv('QR_JOB_POLL_SECONDS', '5'))
+    QR_JOB_MAX_ATTEMPTS = int(os.getenv('QR_JOB_MAX_ATTEMPTS', '6'))
+    QR_JOB_RETRY_BASE_SECONDS = int(os.getenv('QR_JOB_RETRY_BASE_SECONDS', '30'))
+    QR_JOB_RETRY_MAX_SECONDS = int(os.getenv('QR_JOB_RETRY_MAX_SECONDS', '3600'))
+    QR_JOB_CLAIM_TIMEOUT_SECONDS = int(os.getenv('QR_JOB_CLAIM_TIMEOUT_SECONDS', '300'))
+    
+    # Server-sent events Configuration
+    EVENT_BROKER = os.getenv('EVENT_BROKER', 'memory')  # 'memory' or 'redis'
+    SSE_HEARTBEAT_SECONDS = int(os.getenv('SSE_HEARTBEAT_SECONDS', '15'))
+    SSE_MAX_STREAM_SECONDS = int(os.getenv('SSE_MAX_STREAM_SECONDS', '300'))
+    # Open streams per worker process; keep it below gunicorn's --threads
+    SSE_MAX_STREAMS = int(os.getenv('SSE_MAX_STREAMS', '16'))
+    
+    # SMTP Configuration (SMTP_POOL_SIZE=0 opens a new connection per email)
+    SMTP_HOST = os.getenv('SMTP_HOST', 'smtp.gmail.com')
+    SMTP_PORT = int(os.getenv('SMTP_PORT', '587'))
+    SMTP_USE_STARTTLS = os.getenv('SMTP_USE_STARTTLS', 'True').lower() == 'true'
+    SMTP_TIMEOUT_SECONDS = int(os.getenv('SMTP_TIMEOUT_SECONDS', '30'))
+    SMTP_POOL_SIZE = int(os.getenv('SMTP_POOL_SIZE', '2'))
+    SMTP_MAX_IDLE_SECONDS = int(os.getenv('SMTP_MAX_IDLE_SECONDS', '60'))
+    SMTP_MAX_MESSAGES_PER_CONNECTION = int(os.getenv('SMTP_MAX_MESSAGES_PER_CONNECTION', '100'))
+    
+    # Email outbox Configuration (delays in seconds)
+    EMAIL_OUTBOX_PATH = os.getenv('EMAIL_OUTBOX_PATH', os.path.join(os.path.dirname(__file__), 'data', 'email_outbox.sqlite3'))
+    EMAIL_WORKERS = int(os.getenv('EMAIL_WORKERS', '2'))
+    EMAIL_MAX_PER_SECOND = float(os.getenv('EMAIL_MAX_PER_SECOND', '5'))
+    EMAIL_POLL_SECONDS = int(os.getenv('EMAIL_POLL_SECONDS', '5'))
+    EMAIL_MAX_ATTEMPTS = int(os.getenv('EMAIL_MAX_ATTEMPTS', '8'))
+    EMAIL_RETRY_BASE_SECONDS = int(os.getenv('EMAIL_RETRY_BASE_SECONDS', '30'))
+    EMAIL_RETRY_MAX_SECONDS = int(os.getenv('EMAIL_RETRY_MAX_SECONDS', '3600'))
+    EMAIL_CLAIM_TIMEOUT_SECONDS = int(os.getenv('EMAIL_CLAIM_TIMEOUT_SECONDS', '300'))
+    EMAIL_OUTBOX_RETENTION_SECONDS = int(os.getenv('EMAIL_OUTBOX_RETENTION_SECONDS', '604800'))
+    
+    # Appointment reminders (REMINDER_INTERVAL_SECONDS=0 disables the scheduler)
+    REMINDER_INTERVAL_SECONDS = int(os.getenv('REMINDER_INTERVAL_SECONDS', '900'))
+    REMINDER_LEAD_HOURS = int(os.getenv('REMINDER_LEAD_HOURS', '24'))
+    REMINDER_BATCH_SIZE = int(os.getenv('REMINDER_BATCH_SIZE', '1000'))
+    
+    # List endpoint pagination
+    DEFAULT_PAGE_SIZE = int(os.getenv('DEFAULT_PAGE_SIZE', '100'))
+    MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', '500'))
     
     @classmethod
     def validate_supabase_config(cls):
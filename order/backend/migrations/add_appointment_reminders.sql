@@ -0,0 +1,10 @@
+-- Migration: Track which appointments have had their reminder email queued
+-- Run this in your Supabase SQL editor
+
+-- The reminder scheduler only emails rows it changes from NULL, so reruns never double-send
+ALTER TABLE appointments ADD COLUMN IF NOT EXISTS reminder_sent_at TIMESTAMP WITH TIME ZONE;
+
+-- Index for the scheduler's "upcoming appointments still needing a reminder" range query
+CREATE INDEX IF NOT EXISTS idx_appointments_reminder_due
+  ON appointments(appointment_date, appointment_time)
+  WHERE reminder_sent_at IS NULL;
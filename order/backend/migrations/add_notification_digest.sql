@@ -0,0 +1,6 @@
+-- Migration: Per-business digest mode for new-booking notification emails
+-- Run this in your Supabase SQL editor
+
+-- 0 (default) emails the business on every booking; N > 0 sends one summary
+-- of all bookings made in the N minutes after the first unsent one
+ALTER TABLE businesses ADD COLUMN IF NOT EXISTS notification_digest_minutes INTEGER NOT NULL DEFAULT 0;
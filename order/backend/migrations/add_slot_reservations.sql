@@ -0,0 +1,86 @@
+-- Migration: Prevent double booking and hold slots during checkout
+-- Run this in your Supabase SQL editor, then re-run create_book_appointment_function.sql
+
+-- At most one active appointment per business, date and time. Concurrent
+-- bookings for the same slot now fail with a unique violation (API: 409).
+-- If this fails, resolve the existing double bookings listed by:
+--   SELECT business_id, appointment_date, appointment_time, COUNT(*)
+--   FROM appointments WHERE status IS DISTINCT FROM 'cancelled'
+--   GROUP BY 1, 2, 3 HAVING COUNT(*) > 1;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_appointments_unique_slot
+  ON appointments(business_id, appointment_date, appointment_time)
+  WHERE status IS DISTINCT FROM 'cancelled';
+
+-- Short-lived reservations taken when a customer picks a time, so nobody
+-- else can book it while they fill in their details
+CREATE TABLE IF NOT EXISTS appointment_holds (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  business_id UUID REFERENCES businesses(id) ON DELETE CASCADE,
+  appointment_date DATE NOT NULL,
+  appointment_time TIME NOT NULL,
+  expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  UNIQUE(business_id, appointment_date, appointment_time)
+);
+
+CREATE INDEX IF NOT EXISTS idx_appointment_holds_expires ON appointment_holds(expires_at);
+
+-- Hashed address of the client that took each hold, so one client can only
+-- keep a few slots reserved at a time (APPOINTMENT_MAX_HOLDS_PER_CLIENT)
+ALTER TABLE appointment_holds ADD COLUMN IF NOT EXISTS client_key TEXT;
+CREATE INDEX IF NOT EXISTS idx_appointment_holds_client ON appointment_holds(client_key, expires_at);
+
+-- Minutes the held service takes (a whole number of 30-minute slots), so a
+-- hold covers every slot the booking would
+ALTER TABLE appointment_holds ADD COLUMN IF NOT EXISTS duration_minutes INTEGER NOT NULL DEFAULT 30;
+CREATE INDEX IF NOT EXISTS idx_appointment_holds_business_date ON appointment_holds(business_id, appointment_date);
+
+-- A hold may not overlap another unexpired hold or an active appointment.
+-- Holds and bookings for the same business and day take the same
+-- transaction-level advisory lock as prevent_overlapping_appointments.sql,
+-- so concurrent ones cannot both pass. A conflict raises unique_violation,
+-- which the API returns as 409.
+CREATE OR REPLACE FUNCTION prevent_overlapping_holds()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_start TIMESTAMP;
+    v_end TIMESTAMP;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext(NEW.business_id::TEXT || ':' || NEW.appointment_date::TEXT));
+
+    v_start := NEW.appointment_date + NEW.appointment_time;
+    v_end := v_start + make_interval(mins => NEW.duration_minutes);
+
+    IF EXISTS (
+        SELECT 1 FROM appointment_holds h
+        WHERE h.business_id = NEW.business_id
+          AND h.appointment_date = NEW.appointment_date
+          AND h.id IS DISTINCT FROM NEW.id
+          AND h.expires_at > NOW()
+          AND h.appointment_date + h.appointment_time < v_end
+          AND v_start < h.appointment_date + h.appointment_time + make_interval(mins => h.duration_minutes)
+    ) OR EXISTS (
+        SELECT 1 FROM appointments a
+        LEFT JOIN services s ON s.id = a.service_id
+        WHERE a.business_id = NEW.business_id
+          AND a.appointment_date = NEW.appointment_date
+          AND a.status IS DISTINCT FROM 'cancelled'
+          AND a.appointment_date + a.appointment_time < v_end
+          AND v_start < a.appointment_date + a.appointment_time
+              + make_interval(mins => GREATEST(1, CEIL(COALESCE(s.duration, 0) / 30.0))::INTEGER * 30)
+    ) THEN
+        RAISE EXCEPTION 'Time slot overlaps another hold or appointment' USING ERRCODE = 'unique_violation';
+    END IF;
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS appointment_holds_prevent_overlap ON appointment_holds;
+
+CREATE TRIGGER appointment_holds_prevent_overlap
+    BEFORE INSERT OR UPDATE ON appointment_holds
+    FOR EACH ROW EXECUTE FUNCTION prevent_overlapping_holds();
+
+-- Expired holds are ignored and replaced on demand; clear leftovers periodically, e.g.
+-- DELETE FROM appointment_holds WHERE expires_at < NOW();
@@ -0,0 +1,45 @@
+-- Migration: Track appointment changes for delta sync (?since=<cursor>)
+-- Run this in your Supabase SQL editor
+
+-- Keep updated_at current on every update, whoever makes it
+CREATE OR REPLACE FUNCTION touch_appointment_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS appointments_touch_updated_at ON appointments;
+CREATE TRIGGER appointments_touch_updated_at
+BEFORE UPDATE ON appointments
+FOR EACH ROW EXECUTE FUNCTION touch_appointment_updated_at();
+
+-- Tombstones for deleted appointments so clients can drop them locally
+CREATE TABLE IF NOT EXISTS appointment_tombstones (
+  appointment_id UUID PRIMARY KEY,
+  business_id UUID NOT NULL,
+  deleted_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE OR REPLACE FUNCTION record_appointment_tombstone()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO appointment_tombstones (appointment_id, business_id, deleted_at)
+    VALUES (OLD.id, OLD.business_id, NOW())
+    ON CONFLICT (appointment_id) DO UPDATE SET deleted_at = EXCLUDED.deleted_at;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS appointments_record_tombstone ON appointments;
+CREATE TRIGGER appointments_record_tombstone
+AFTER DELETE ON appointments
+FOR EACH ROW EXECUTE FUNCTION record_appointment_tombstone();
+
+-- Indexes for "changed since" lookups per business
+CREATE INDEX IF NOT EXISTS idx_appointments_business_updated ON appointments(business_id, updated_at);
+CREATE INDEX IF NOT EXISTS idx_appointment_tombstones_business_deleted ON appointment_tombstones(business_id, deleted_at);
+
+-- Tombstones only need to outlive the slowest polling client; prune old ones periodically, e.g.
+-- DELETE FROM appointment_tombstones WHERE deleted_at < NOW() - INTERVAL '30 days';
@@ -0,0 +1,90 @@
+-- Migration: Book an appointment in one round trip
+-- Run this in your Supabase SQL editor
+--
+-- Called by POST /api/appointments via supabase.rpc('book_appointment', ...).
+-- Finds or creates the customer, resolves the service by name, inserts the
+-- appointment and returns it with the service price and the business contact
+-- details needed for the confirmation emails. Until this function exists the
+-- API falls back to separate queries.
+--
+-- A booking whose duration overlaps a slot held by another customer (see
+-- add_slot_reservations.sql) or another booking (see
+-- prevent_overlapping_appointments.sql) raises unique_violation, which the
+-- API returns as 409. Passing p_hold_id books the caller's own hold and
+-- releases it.
+
+-- Earlier version without p_hold_id
+DROP FUNCTION IF EXISTS book_appointment(UUID, TEXT, DATE, TIME, TEXT, TEXT, TEXT, TEXT, TEXT);
+
+CREATE OR REPLACE FUNCTION book_appointment(
+    p_business_id UUID,
+    p_service_name TEXT,
+    p_appointment_date DATE,
+    p_appointment_time TIME,
+    p_customer_name TEXT,
+    p_customer_email TEXT,
+    p_customer_phone TEXT DEFAULT '',
+    p_status TEXT DEFAULT 'confirmed',
+    p_notes TEXT DEFAULT '',
+    p_hold_id UUID DEFAULT NULL
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_customer_id UUID;
+    v_service services%ROWTYPE;
+    v_appointment appointments%ROWTYPE;
+    v_start TIMESTAMP;
+    v_end TIMESTAMP;
+BEGIN
+    -- Existing customers are reused as is, new ones are created
+    INSERT INTO customers (name, email, phone)
+    VALUES (p_customer_name, p_customer_email, p_customer_phone)
+    ON CONFLICT (email) DO NOTHING
+    RETURNING id INTO v_customer_id;
+
+    IF v_customer_id IS NULL THEN
+        SELECT id INTO v_customer_id FROM customers WHERE email = p_customer_email;
+    END IF;
+
+    SELECT * INTO v_service
+    FROM services
+    WHERE business_id = p_business_id AND name = p_service_name
+    LIMIT 1;
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Service not found' USING ERRCODE = 'P0002';
+    END IF;
+
+    -- Same lock as new holds take, so no hold slips in between the check and the insert
+    PERFORM pg_advisory_xact_lock(hashtext(p_business_id::TEXT || ':' || p_appointment_date::TEXT));
+
+    -- Release the caller's hold and expired ones; an overlapping hold left over belongs to someone else
+    DELETE FROM appointment_holds
+    WHERE business_id = p_business_id
+      AND appointment_date = p_appointment_date
+      AND (id = p_hold_id OR expires_at < NOW());
+
+    v_start := p_appointment_date + p_appointment_time;
+    v_end := v_start + make_interval(mins => GREATEST(1, CEIL(COALESCE(v_service.duration, 0) / 30.0))::INTEGER * 30);
+
+    IF EXISTS (
+        SELECT 1 FROM appointment_holds h
+        WHERE h.business_id = p_business_id
+          AND h.appointment_date = p_appointment_date
+          AND h.appointment_date + h.appointment_time < v_end
+          AND v_start < h.appointment_date + h.appointment_time + make_interval(mins => h.duration_minutes)
+    ) THEN
+        RAISE EXCEPTION 'Time slot is held by another customer' USING ERRCODE = 'unique_violation';
+    END IF;
+
+    INSERT INTO appointments (business_id, customer_id, service_id, appointment_date, appointment_time, status, notes)
+    VALUES (p_business_id, v_customer_id, v_service.id, p_appointment_date, p_appointment_time, p_status, p_notes)
+    RETURNING * INTO v_appointment;
+
+    RETURN jsonb_build_object(
+        'appointment', to_jsonb(v_appointment),
+        'service_price', v_service.price,
+        'business', (SELECT to_jsonb(b) - 'password_hash' FROM businesses b WHERE b.id = p_business_id)
+    );
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,67 @@
+-- Migration: Reject appointments that overlap another booking
+-- Run this in your Supabase SQL editor (after add_slot_reservations.sql)
+--
+-- idx_appointments_unique_slot only stops two bookings starting at the same
+-- time, but availability blocks every 30-minute slot a service's duration
+-- covers. This trigger rejects an appointment whose slots overlap those of
+-- another active appointment of the business, for book_appointment() and
+-- the API's direct inserts and updates alike. Durations are rounded up to
+-- whole 30-minute slots, as in the availability API. A conflict raises
+-- unique_violation, which the API returns as 409.
+--
+-- Writes for the same business and day take a transaction-level advisory
+-- lock first, so two overlapping bookings made at the same moment cannot
+-- both pass the check.
+
+-- Minutes an appointment for a service occupies
+CREATE OR REPLACE FUNCTION appointment_slot_minutes(p_service_id UUID)
+RETURNS INTEGER AS $$
+    SELECT GREATEST(1, CEIL(COALESCE((SELECT duration FROM services WHERE id = p_service_id), 0) / 30.0))::INTEGER * 30;
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION prevent_overlapping_appointments()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_start TIMESTAMP;
+    v_end TIMESTAMP;
+BEGIN
+    IF NEW.status IS NOT DISTINCT FROM 'cancelled' THEN
+        RETURN NEW;
+    END IF;
+
+    -- Updates that keep an active appointment where it is (status changes, notes) are not re-checked
+    IF TG_OP = 'UPDATE'
+       AND OLD.status IS DISTINCT FROM 'cancelled'
+       AND NEW.business_id IS NOT DISTINCT FROM OLD.business_id
+       AND NEW.appointment_date IS NOT DISTINCT FROM OLD.appointment_date
+       AND NEW.appointment_time IS NOT DISTINCT FROM OLD.appointment_time
+       AND NEW.service_id IS NOT DISTINCT FROM OLD.service_id THEN
+        RETURN NEW;
+    END IF;
+
+    PERFORM pg_advisory_xact_lock(hashtext(NEW.business_id::TEXT || ':' || NEW.appointment_date::TEXT));
+
+    v_start := NEW.appointment_date + NEW.appointment_time;
+    v_end := v_start + make_interval(mins => appointment_slot_minutes(NEW.service_id));
+
+    IF EXISTS (
+        SELECT 1 FROM appointments a
+        WHERE a.business_id = NEW.business_id
+          AND a.appointment_date = NEW.appointment_date
+          AND a.id IS DISTINCT FROM NEW.id
+          AND a.status IS DISTINCT FROM 'cancelled'
+          AND a.appointment_date + a.appointment_time < v_end
+          AND v_start < a.appointment_date + a.appointment_time + make_interval(mins => appointment_slot_minutes(a.service_id))
+    ) THEN
+        RAISE EXCEPTION 'Time slot overlaps another appointment' USING ERRCODE = 'unique_violation';
+    END IF;
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS appointments_prevent_overlap ON appointments;
+
+CREATE TRIGGER appointments_prevent_overlap
+    BEFORE INSERT OR UPDATE ON appointments
+    FOR EACH ROW EXECUTE FUNCTION prevent_overlapping_appointments();
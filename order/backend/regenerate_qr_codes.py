@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Regenerate the QR code of every business
+Run this after changing FRONTEND_URL so every QR code points at the new
+booking page URL.
+
+Businesses are read in pages, each page's QR codes are rendered in a pool of
+processes and uploaded with a bounded number of concurrent requests over one
+pooled HTTP session. Progress is saved to a state file after every page, so
+an interrupted run continues where it stopped with --resume (businesses that
+failed to upload are retried first).
+
+    python regenerate_qr_codes.py [--resume] [--concurrency 16] [--processes 4]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from services.database import get_supabase
+from services.pagination import paginate, page_response
+from services.qr_render import render_url_svg
+from services.qr_service import QRCodeService, business_booking_url
+from services.http_client import create_http_session
+
+BUSINESS_COLUMNS = 'id, slug, name, qr_code_name'
+BUSINESS_SORT_COLUMNS = ['id']
+DEFAULT_STATE_PATH = os.path.join(os.path.dirname(__file__), 'data', 'qr_regeneration.json')
+
+def load_state(path):
+    """Read a saved run, or None if there is none"""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def save_state(path, state):
+    """Write the run state atomically so a crash never leaves it half written"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+def count_businesses(supabase):
+    """Total number of businesses, or None if the count is unavailable"""
+    try:
+        return supabase.table('businesses').select('id', count='exact').limit(1).execute().count
+    except Exception:
+        return None
+
+def fetch_pages(supabase, page_size, after):
+    """Yield (businesses, next_cursor) for every page after the cursor"""
+    while True:
+        query = supabase.table('businesses').select(BUSINESS_COLUMNS)
+        result = paginate(query, BUSINESS_SORT_COLUMNS, page_size, after).execute()
+        page = page_response(result.data, BUSINESS_SORT_COLUMNS, page_size)
+        yield page['data'], page['next_cursor']
+        after = page['next_cursor']
+        if not after:
+            return
+
+def regenerate(businesses, qr_service, renderer, uploader, session):
+    """Render and upload QR codes for a list of businesses; returns the failures as dicts"""
+    svgs = renderer.map(render_url_svg, [business_booking_url(b['slug']) for b in businesses], chunksize=16)
+
+    def upload(business, svg_content):
+        try:
+            filename = qr_service.upload_business_qr_code(business['id'], business['slug'], svg_content, session=session)
+            if business.get('qr_code_name') != filename:
+                qr_service.update_business_qr_code_name(business['id'], filename, session=session)
+            return None
+        except Exception as e:
+            return {'id': business['id'], 'slug': business['slug'], 'name': business['name'], 'error': str(e)[:500]}
+
+    results = uploader.map(upload, businesses, svgs)
+    return [failure for failure in results if failure]
+
+def main():
+    parser = argparse.ArgumentParser(description='Regenerate every business QR code')
+    parser.add_argument('--resume', action='store_true', help='continue the run saved in the state file')
+    parser.add_argument('--state', default=DEFAULT_STATE_PATH, help='progress file (default: data/qr_regeneration.json)')
+    parser.add_argument('--page-size', type=int, default=500, help='businesses read per query')
+    parser.add_argument('--concurrency', type=int, default=16, help='uploads in flight at once')
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1, help='rendering processes')
+    args = parser.parse_args()
+
+    frontend_url = os.getenv('FRONTEND_URL', 'http://localhost:5173')
+    state = load_state(args.state) if args.resume else None
+    if state and state.get('frontend_url') != frontend_url:
+        print(f"❌ Saved run was for FRONTEND_URL={state.get('frontend_url')}, not {frontend_url}; start a new run without --resume")
+        return 1
+    if state and state.get('finished') and not state.get('failed'):
+        print("✅ Saved run already finished")
+        return 0
+    if not state:
+        state = {'frontend_url': frontend_url, 'after': None, 'done': 0, 'failed': [], 'finished': False}
+
+    supabase = get_supabase()
+    if not supabase:
+        print("❌ Database not available (check the Supabase configuration)")
+        return 1
+    qr_service = QRCodeService()
+    if not qr_service.enabled:
+        print("❌ QR code service not available (check the Supabase configuration)")
+        return 1
+    qr_service.ensure_bucket()
+
+    total = count_businesses(supabase)
+    started = time.monotonic()
+    # One pooled connection per concurrent upload
+    session = create_http_session(pool_maxsize=args.concurrency)
+
+    def report():
+        elapsed = time.monotonic() - started
+        progress = f"{state['done']}/{total}" if total is not None else str(state['done'])
+        print(f"📊 {progress} regenerated, {len(state['failed'])} failed, {elapsed:.0f}s elapsed")
+
+    with ProcessPoolExecutor(max_workers=args.processes) as renderer, ThreadPoolExecutor(max_workers=args.concurrency) as uploader:
+        # Businesses that failed in an earlier run go first
+        if state['failed']:
+            retry = state['failed']
+            state['failed'] = regenerate(retry, qr_service, renderer, uploader, session)
+            state['done'] += len(retry) - len(state['failed'])
+            save_state(args.state, state)
+            report()
+
+        if not state['finished']:
+            for businesses, next_cursor in fetch_pages(supabase, args.page_size, state['after']):
+                failures = regenerate(businesses, qr_service, renderer, uploader, session)
+                state['failed'].extend(failures)
+                state['done'] += len(businesses) - len(failures)
+                state['after'] = next_cursor
+                save_state(args.state, state)
+                report()
+            state['finished'] = True
+            save_state(args.state, state)
+
+    if state['failed']:
+        print(f"⚠️  {len(state['failed'])} QR codes failed; run again with --resume to retry them (details in {args.state})")
+        return 1
+    print(f"✅ Regenerated {state['done']} QR codes in {time.monotonic() - started:.0f}s")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,55 +1,356 @@
-from flask import Blueprint, request, jsonify
-from datetime import datetime
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from datetime import datetime, timedelta, timezone
 import uuid
+import json
+import time
+import base64
+import binascii
+import hashlib
 import logging
-from services.database import DatabaseService
-from services.email_service import EmailService
+from services.database import supabase_client
+from config import Config
+from services.http_cache import business_validators, not_modified, add_validators, bump_business_version
+from services.email_service import get_email_service
+from services.email_outbox import enqueue_email, hold_for_digest
+from services.availability_store import invalidate_availability_dates, invalidate_business_availability, get_service_length, is_start_bookable
+from services.events import get_broker, business_channel, publish_business_event, acquire_stream_slot, release_stream_slot
+from services.pagination import get_page_args, paginate, page_response
+from services.availability import SLOT_MINUTES, time_to_slot, duration_to_slots, run_mask, group_booked_masks, group_hold_masks
 
 appointment_bp = Blueprint('appointments', __name__)
 logger = logging.getLogger(__name__)
 
-# Initialize database service
-try:
-    db_service = DatabaseService()
-    supabase = db_service.get_supabase_client()
-except Exception as e:
-    logger.error(f"Failed to initialize database service: {e}")
-    db_service = None
-    supabase = None
+# Columns returned by the appointment lists, with only the customer and
+# service fields the dashboards show
+APPOINTMENT_LIST_COLUMNS = (
+    'id, business_id, customer_id, service_id, appointment_date, appointment_time, status, notes, updated_at, '
+    'customers(id, name, email, phone), services(id, name, price, duration)'
+)
+APPOINTMENT_SORT_COLUMNS = ['appointment_date', 'appointment_time', 'id']
 
-# Initialize email service
-try:
-    email_service = EmailService()
-except Exception as e:
-    logger.error(f"Failed to initialize email service: {e}")
-    email_service = None
+# Cursor for a sync that has not seen any changes yet
+SYNC_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Shared Supabase client, created on first use
+supabase = supabase_client
 
 @appointment_bp.route('/', methods=['GET'])
 def get_appointments():
-    """Get all appointments"""
+    """Get a page of appointments (?limit=, ?after=<next_cursor>)"""
     try:
         if not supabase:
             return jsonify({'error': 'Database connection not available'}), 500
         
-        result = supabase.table('appointments').select('*, customers(*), services(*)').execute()
-        return jsonify(result.data)
+        try:
+            limit, after = get_page_args()
+            query = paginate(supabase.table('appointments').select(APPOINTMENT_LIST_COLUMNS), APPOINTMENT_SORT_COLUMNS, limit, after)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        result = query.execute()
+        return jsonify(page_response(result.data, APPOINTMENT_SORT_COLUMNS, limit))
     except Exception as e:
         logger.error(f"Error fetching appointments: {e}")
         return jsonify({'error': 'Failed to fetch appointments'}), 500
 
+def encode_sync_cursor(timestamp):
+    """Encode a change timestamp as an opaque, URL-safe sync cursor"""
+    return base64.urlsafe_b64encode(timestamp.isoformat().encode('utf-8')).decode('ascii')
+
+def decode_sync_cursor(cursor):
+    """Decode a sync cursor back to its timestamp, raising ValueError if malformed"""
+    try:
+        timestamp = datetime.fromisoformat(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+    except (binascii.Error, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp
+
 @appointment_bp.route('/business/<business_id>', methods=['GET'])
 def get_business_appointments(business_id):
-    """Get appointments for a specific business"""
+    """Get a page of appointments for a specific business (?limit=, ?after=<next_cursor>).
+    
+    With ?since=<cursor> only appointments created or updated since the cursor
+    are returned, plus the ids of deleted ones and a new cursor. An empty
+    since starts a sync and returns everything.
+    
+    The cursor is the newest updated_at/deleted_at seen, and changes are
+    matched with >= it, so the rows at the cursor come back on every poll
+    until something newer changes. Clients must merge by id, which makes
+    these repeats no-ops.
+    """
     try:
         if not supabase:
             return jsonify({'error': 'Database connection not available'}), 500
         
-        result = supabase.table('appointments').select('*, customers(*), services(*)').eq('business_id', business_id).execute()
-        return jsonify(result.data)
+        etag, last_modified = business_validators(business_id)
+        cached_response = not_modified(etag, last_modified)
+        if cached_response:
+            return cached_response
+        
+        since = request.args.get('since')
+        query = supabase.table('appointments').select(APPOINTMENT_LIST_COLUMNS).eq('business_id', business_id)
+        
+        if since is None:
+            try:
+                limit, after = get_page_args()
+                query = paginate(query, APPOINTMENT_SORT_COLUMNS, limit, after)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            
+            result = query.execute()
+            return add_validators(jsonify(page_response(result.data, APPOINTMENT_SORT_COLUMNS, limit)), etag, last_modified)
+        
+        since_timestamp = None
+        if since:
+            try:
+                since_timestamp = decode_sync_cursor(since)
+            except ValueError:
+                return jsonify({'error': 'Invalid since cursor'}), 400
+            # gte rather than gt so rows sharing the cursor timestamp are never
+            # skipped; the boundary rows are re-sent and clients merge them by id
+            query = query.gte('updated_at', since_timestamp.isoformat())
+        
+        result = query.execute()
+        change_timestamps = [
+            datetime.fromisoformat(apt['updated_at'])
+            for apt in result.data if apt.get('updated_at')
+        ]
+        
+        deleted_ids = []
+        if since_timestamp:
+            change_timestamps.append(since_timestamp)
+            try:
+                tombstones_result = supabase.table('appointment_tombstones').select('appointment_id, deleted_at').eq('business_id', business_id).gte('deleted_at', since_timestamp.isoformat()).execute()
+                for tombstone in tombstones_result.data:
+                    deleted_ids.append(tombstone['appointment_id'])
+                    change_timestamps.append(datetime.fromisoformat(tombstone['deleted_at']))
+            except Exception as e:
+                # If appointment_tombstones table doesn't exist, deletes are not reported
+                logger.warning(f"Could not check deleted appointments: {e}")
+        
+        # Cursors only ever hold database timestamps: with nothing synced yet the
+        # next poll starts from the epoch rather than this server's clock, which
+        # may run ahead of the database and skip rows written in between
+        cursor_timestamp = max(change_timestamps) if change_timestamps else SYNC_EPOCH
+        
+        response = jsonify({
+            'appointments': result.data,
+            'deleted': deleted_ids,
+            'cursor': encode_sync_cursor(cursor_timestamp)
+        })
+        return add_validators(response, etag, last_modified)
     except Exception as e:
         logger.error(f"Error fetching business appointments: {e}")
         return jsonify({'error': 'Failed to fetch appointments'}), 500
 
+@appointment_bp.route('/business/<business_id>/events', methods=['GET'])
+def stream_business_events(business_id):
+    """Stream appointment created/updated/deleted events for a business as server-sent events.
+    
+    When this process already serves SSE_MAX_STREAMS streams it answers 503
+    instead; EventSource then gives up and the dashboard polls ?since=.
+    """
+    if not acquire_stream_slot():
+        response = jsonify({'error': 'Too many live connections, poll for changes instead'})
+        response.headers['Retry-After'] = str(Config.SSE_MAX_STREAM_SECONDS)
+        return response, 503
+    
+    def generate():
+        subscription = get_broker().subscribe(business_channel(business_id))
+        try:
+            # Reconnect quickly after the stream is recycled
+            yield 'retry: 3000\n\n'
+            # Streams are recycled periodically so idle connections don't pin worker threads forever
+            deadline = time.monotonic() + Config.SSE_MAX_STREAM_SECONDS
+            while time.monotonic() < deadline:
+                event = subscription.get(timeout=Config.SSE_HEARTBEAT_SECONDS)
+                if event is None:
+                    yield ': keep-alive\n\n'
+                else:
+                    yield f"event: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+        finally:
+            subscription.close()
+    
+    response = Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+    # Runs even if the client leaves before the stream starts
+    response.call_on_close(release_stream_slot)
+    return response
+
+class SlotUnavailableError(Exception):
+    """The requested time slot is already booked or held by another customer"""
+
+def is_unique_violation(error):
+    """Whether a Supabase error is a unique constraint violation (a slot conflict)"""
+    return getattr(error, 'code', None) == '23505'
+
+def overlaps_booking(business_id, date_str, time_str, duration):
+    """Whether a booking of duration minutes would cover a slot of another active appointment.
+
+    The database enforces this too (migrations/prevent_overlapping_appointments.sql);
+    checking here keeps the query path safe where that migration is missing.
+    """
+    start_slot = time_to_slot(time_str)
+    if start_slot is None:
+        return False
+    result = supabase.table('appointments').select('appointment_date, appointment_time, services(duration)').eq('business_id', business_id).eq('appointment_date', date_str).neq('status', 'cancelled').execute()
+    booked_mask = group_booked_masks(result.data).get(date_str, 0)
+    return bool(booked_mask & run_mask(start_slot, duration_to_slots(duration)))
+
+# Set to False once the book_appointment function turns out to be missing,
+# so later bookings go straight to the query path until the next restart
+booking_rpc_available = True
+
+def book_appointment_rpc(appointment_data):
+    """Book through the book_appointment database function in one round trip.
+
+    Returns (appointment, service_price, business_data), or None if the
+    function is not installed (see migrations/create_book_appointment_function.sql).
+    Raises LookupError if the service does not exist and SlotUnavailableError
+    if the slot is taken.
+    """
+    global booking_rpc_available
+    if not booking_rpc_available:
+        return None
+    
+    params = {
+        'p_business_id': appointment_data['business_id'],
+        'p_service_name': appointment_data['service_name'],
+        'p_appointment_date': appointment_data['date'],
+        'p_appointment_time': appointment_data['time'],
+        'p_customer_name': appointment_data['customer_name'],
+        'p_customer_email': appointment_data['customer_email'],
+        'p_customer_phone': appointment_data.get('customer_phone', ''),
+        'p_status': appointment_data.get('status', 'confirmed'),
+        'p_notes': appointment_data.get('notes', '')
+    }
+    if appointment_data.get('hold_id'):
+        params['p_hold_id'] = appointment_data['hold_id']
+    
+    try:
+        result = supabase.rpc('book_appointment', params).execute()
+    except Exception as e:
+        code = getattr(e, 'code', None)
+        if code == 'P0002':
+            raise LookupError('Service not found') from e
+        if is_unique_violation(e):
+            raise SlotUnavailableError() from e
+        if code in ('PGRST202', '42883'):
+            logger.warning(f"book_appointment function not installed, booking with separate queries: {e}")
+            booking_rpc_available = False
+            return None
+        raise
+    
+    booking = result.data
+    return booking['appointment'], booking['service_price'], booking.get('business') or {}
+
+def book_appointment_queries(appointment_data):
+    """Book with separate customer, service and appointment queries.
+
+    Returns (appointment, service_price, None); business details are looked
+    up later only if emails are sent. Raises LookupError if the service does
+    not exist and SlotUnavailableError if the slot is taken.
+    """
+    # Check if customer exists, create if not
+    customer_result = supabase.table('customers').select('id').eq('email', appointment_data['customer_email']).execute()
+    
+    if customer_result.data:
+        customer_id = customer_result.data[0]['id']
+    else:
+        # Create new customer
+        new_customer = {
+            'id': str(uuid.uuid4()),
+            'name': appointment_data['customer_name'],
+            'email': appointment_data['customer_email'],
+            'phone': appointment_data.get('customer_phone', '')
+        }
+        customer_result = supabase.table('customers').insert(new_customer).execute()
+        customer_id = customer_result.data[0]['id']
+    
+    # Get service by name
+    service_result = supabase.table('services').select('id, price, duration').eq('name', appointment_data['service_name']).eq('business_id', appointment_data['business_id']).execute()
+    
+    if not service_result.data:
+        raise LookupError('Service not found')
+    
+    service_id = service_result.data[0]['id']
+    
+    duration = service_result.data[0].get('duration')
+    if overlaps_hold(appointment_data['business_id'], appointment_data['date'], appointment_data['time'], duration, appointment_data.get('hold_id')):
+        raise SlotUnavailableError()
+    
+    if overlaps_booking(appointment_data['business_id'], appointment_data['date'], appointment_data['time'], duration):
+        raise SlotUnavailableError()
+    
+    # Create appointment
+    new_appointment = {
+        'id': str(uuid.uuid4()),
+        'business_id': appointment_data['business_id'],
+        'customer_id': customer_id,
+        'service_id': service_id,
+        'appointment_date': appointment_data['date'],
+        'appointment_time': appointment_data['time'],
+        'status': appointment_data.get('status', 'confirmed'),
+        'notes': appointment_data.get('notes', '')
+    }
+    
+    try:
+        result = supabase.table('appointments').insert(new_appointment).execute()
+    except Exception as e:
+        if is_unique_violation(e):
+            raise SlotUnavailableError() from e
+        raise
+    
+    if not result.data:
+        return None, None, None
+    
+    if appointment_data.get('hold_id'):
+        release_hold(appointment_data['hold_id'])
+    return result.data[0], service_result.data[0]['price'], None
+
+def overlaps_hold(business_id, date_str, time_str, duration, hold_id=None):
+    """Whether a booking of duration minutes would cover a slot of an unexpired hold other than hold_id"""
+    start_slot = time_to_slot(time_str)
+    if start_slot is None:
+        return False
+    try:
+        query = supabase.table('appointment_holds').select('appointment_date, appointment_time, duration_minutes, expires_at').eq('business_id', business_id).eq('appointment_date', date_str).gt('expires_at', datetime.now(timezone.utc).isoformat())
+        if hold_id:
+            query = query.neq('id', hold_id)
+        held_mask = 0
+        for hold_mask, _ in group_hold_masks(query.execute().data).get(date_str, []):
+            held_mask |= hold_mask
+        return bool(held_mask & run_mask(start_slot, duration_to_slots(duration)))
+    except Exception as e:
+        # If appointment_holds table doesn't exist, continue without checking
+        logger.warning(f"Could not check slot holds: {e}")
+        return False
+
+def release_hold(hold_id):
+    """Delete a slot hold, ignoring failures (it expires on its own)"""
+    try:
+        supabase.table('appointment_holds').delete().eq('id', hold_id).execute()
+    except Exception as e:
+        logger.warning(f"Could not release slot hold {hold_id}: {e}")
+
+def get_business_contact(business_id):
+    """Get the business fields used by the booking emails"""
+    try:
+        business_result = supabase.table('businesses').select('name, email, address, phone, notification_digest_minutes').eq('id', business_id).execute()
+    except Exception as e:
+        # If notification_digest_minutes column doesn't exist, notify per booking
+        logger.warning(f"Could not read notification digest setting: {e}")
+        business_result = supabase.table('businesses').select('name, email, address, phone').eq('id', business_id).execute()
+    return business_result.data[0] if business_result.data else {}
+
 @appointment_bp.route('/', methods=['POST'])
 def create_appointment():
     """Create a new appointment"""
@@ -65,57 +366,32 @@ def create_appointment():
             if not appointment_data.get(field):
                 return jsonify({'error': f'Missing required field: {field}'}), 400
         
-        # Check if customer exists, create if not
-        customer_result = supabase.table('customers').select('*').eq('email', appointment_data['customer_email']).execute()
-        
-        if customer_result.data:
-            customer_id = customer_result.data[0]['id']
-        else:
-            # Create new customer
-            new_customer = {
-                'id': str(uuid.uuid4()),
-                'name': appointment_data['customer_name'],
-                'email': appointment_data['customer_email'],
-                'phone': appointment_data.get('customer_phone', '')
-            }
-            customer_result = supabase.table('customers').insert(new_customer).execute()
-            customer_id = customer_result.data[0]['id']
-        
-        # Get service by name
-        service_result = supabase.table('services').select('*').eq('name', appointment_data['service_name']).eq('business_id', appointment_data['business_id']).execute()
-        
-        if not service_result.data:
-            return jsonify({'error': 'Service not found'}), 404
-        
-        service_id = service_result.data[0]['id']
-        
-        # Create appointment
-        new_appointment = {
-            'id': str(uuid.uuid4()),
-            'business_id': appointment_data['business_id'],
-            'customer_id': customer_id,
-            'service_id': service_id,
-            'appointment_date': appointment_data['date'],
-            'appointment_time': appointment_data['time'],
-            'status': appointment_data.get('status', 'confirmed'),
-            'notes': appointment_data.get('notes', '')
-        }
+        try:
+            booking = book_appointment_rpc(appointment_data) or book_appointment_queries(appointment_data)
+        except LookupError as e:
+            return jsonify({'error': str(e)}), 404
+        except SlotUnavailableError:
+            return jsonify({'error': 'This time slot is no longer available'}), 409
         
-        result = supabase.table('appointments').insert(new_appointment).execute()
-        
-        if not result.data:
+        created_appointment, service_price, business_data = booking
+        if not created_appointment:
             return jsonify({'error': 'Failed to create appointment'}), 500
         
-        created_appointment = result.data[0]
+        invalidate_availability_dates(appointment_data['business_id'], appointment_data['date'])
+        bump_business_version(appointment_data['business_id'])
+        publish_business_event(appointment_data['business_id'], 'appointment_created', created_appointment)
         
-        # Send confirmation emails only if requested and email service is available
+        # Queue confirmation emails only if requested and email service is available;
+        # they are sent by the outbox workers so SMTP latency never delays the booking
         send_email_confirmation = appointment_data.get('send_email_confirmation', True)
         
-        if email_service and send_email_confirmation:
+        if send_email_confirmation and get_email_service().enabled:
             try:
-                # Get business data
-                business_result = supabase.table('businesses').select('*').eq('id', appointment_data['business_id']).execute()
-                business_data = business_result.data[0] if business_result.data else {}
+                # Get business data (already returned by the booking function)
+                if business_data is None:
+                    business_data = get_business_contact(appointment_data['business_id'])
+                digest_minutes = business_data.get('notification_digest_minutes') or 0
+                business_data = {key: business_data.get(key) for key in ('name', 'email', 'address', 'phone')}
                 
                 # Get customer data
                 customer_data = {
@@ -127,22 +403,42 @@ def create_appointment():
                 # Prepare appointment data for email
                 email_appointment_data = {
                     'service_name': appointment_data['service_name'],
-                    'service_price': service_result.data[0]['price'],
+                    'service_price': service_price,
                     'date': appointment_data['date'],
                     'time': appointment_data['time']
                 }
                 
-                # Send confirmation email to customer
-                email_service.send_appointment_confirmation(email_appointment_data, business_data, customer_data)
+                # Queue confirmation email to customer
+                enqueue_email(
+                    'appointment_confirmation',
+                    appointment_data=email_appointment_data,
+                    business_data=business_data,
+                    customer_data=customer_data
+                )
                 
-                # Only send business notification if business email is valid (not example.com)
+                # Only notify the business if business email is valid (not example.com)
                 if business_data.get('email') and '@example.com' not in business_data['email']:
-                    email_service.send_appointment_notification_to_business(email_appointment_data, business_data, customer_data)
+                    if digest_minutes > 0:
+                        # Digest mode: folded into one summary email per window
+                        hold_for_digest(
+                            appointment_data['business_id'],
+                            digest_minutes * 60,
+                            appointment_data=email_appointment_data,
+                            business_data=business_data,
+                            customer_data=customer_data
+                        )
+                    else:
+                        enqueue_email(
+                            'business_notification',
+                            appointment_data=email_appointment_data,
+                            business_data=business_data,
+                            customer_data=customer_data
+                        )
                 else:
                     logger.info(f"Skipping business notification email - invalid business email: {business_data.get('email')}")
                 
             except Exception as email_error:
-                logger.error(f"Failed to send confirmation emails: {email_error}")
+                logger.error(f"Failed to queue confirmation emails: {email_error}")
                 # Don't fail the appointment creation if email fails
         
         return jsonify(created_appointment), 201
@@ -150,6 +446,96 @@ def create_appointment():
         logger.error(f"Error creating appointment: {e}")
         return jsonify({'error': 'Failed to create appointment'}), 500
 
+def get_client_key():
+    """Hashed address of the calling client, used to limit its holds"""
+    # Render's proxy appends the caller's address to X-Forwarded-For, so the
+    # last entry is the one a client cannot forge
+    forwarded = request.headers.get('X-Forwarded-For', '').split(',')[-1].strip()
+    address = forwarded or request.remote_addr or ''
+    return hashlib.sha256(address.encode('utf-8')).hexdigest()[:32]
+
+@appointment_bp.route('/holds', methods=['POST'])
+def create_hold():
+    """Reserve a time slot for a customer while they fill in the booking form"""
+    try:
+        if not supabase:
+            return jsonify({'error': 'Database connection not available'}), 500
+        
+        hold_data = request.get_json() or {}
+        required_fields = ['business_id', 'date', 'time']
+        for field in required_fields:
+            if field not in hold_data:
+                return jsonify({'error': f'Missing required field: {field}'}), 400
+        
+        business_id = hold_data['business_id']
+        date = hold_data['date']
+        time_str = hold_data['time']
+        
+        try:
+            target_date = datetime.strptime(date, '%Y-%m-%d').date()
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+        start_slot = time_to_slot(str(time_str))
+        if start_slot is None:
+            return jsonify({'error': 'Invalid time'}), 400
+        
+        length = get_service_length(supabase, business_id, hold_data.get('service_id'))
+        if length is None:
+            return jsonify({'error': 'Service not found'}), 404
+        
+        # Only slots the availability API offers can be held: open, free, unheld and not in the past.
+        # The overlap with other holds is rechecked when inserting (prevent_overlapping_holds).
+        if not is_start_bookable(supabase, business_id, target_date, start_slot, length):
+            return jsonify({'error': 'This time slot is no longer available'}), 409
+        
+        now = datetime.now(timezone.utc)
+        client_key = get_client_key()
+        active_holds = supabase.table('appointment_holds').select('id', count='exact').eq('client_key', client_key).gt('expires_at', now.isoformat()).limit(1).execute()
+        if (active_holds.count or 0) >= Config.APPOINTMENT_MAX_HOLDS_PER_CLIENT:
+            return jsonify({'error': 'Too many time slots reserved; book or release one first'}), 429
+        
+        # An expired hold still occupies the unique slot until it is removed
+        supabase.table('appointment_holds').delete().eq('business_id', business_id).eq('appointment_date', date).eq('appointment_time', time_str).lt('expires_at', now.isoformat()).execute()
+        
+        hold = {
+            'id': str(uuid.uuid4()),
+            'business_id': business_id,
+            'appointment_date': date,
+            'appointment_time': time_str,
+            'expires_at': (now + timedelta(seconds=Config.APPOINTMENT_HOLD_SECONDS)).isoformat(),
+            'duration_minutes': length * SLOT_MINUTES,
+            'client_key': client_key
+        }
+        try:
+            supabase.table('appointment_holds').insert(hold).execute()
+        except Exception as e:
+            if is_unique_violation(e):
+                return jsonify({'error': 'This time slot is no longer available'}), 409
+            raise
+        
+        # Held slots are left out of the availability responses
+        invalidate_availability_dates(business_id, date)
+        
+        return jsonify({'id': hold['id'], 'expires_at': hold['expires_at']}), 201
+    except Exception as e:
+        logger.error(f"Error creating slot hold: {e}")
+        return jsonify({'error': 'Failed to reserve time slot'}), 500
+
+@appointment_bp.route('/holds/<hold_id>', methods=['DELETE'])
+def delete_hold(hold_id):
+    """Release a slot hold the customer no longer needs"""
+    try:
+        if not supabase:
+            return jsonify({'error': 'Database connection not available'}), 500
+        
+        result = supabase.table('appointment_holds').delete().eq('id', hold_id).execute()
+        if result.data:
+            invalidate_availability_dates(result.data[0]['business_id'], result.data[0]['appointment_date'])
+        return jsonify({'message': 'Hold released'})
+    except Exception as e:
+        logger.error(f"Error releasing slot hold: {e}")
+        return jsonify({'error': 'Failed to release hold'}), 500
+
 @appointment_bp.route('/<appointment_id>', methods=['GET'])
 def get_appointment(appointment_id):
     """Get specific appointment"""
@@ -185,11 +571,21 @@ def update_appointment(appointment_id):
         updates = request.get_json()
         updates['updated_at'] = datetime.now().isoformat()
         
-        result = supabase.table('appointments').update(updates).eq('id', appointment_id).eq('business_id', business_id).execute()
+        try:
+            result = supabase.table('appointments').update(updates).eq('id', appointment_id).eq('business_id', business_id).execute()
+        except Exception as e:
+            if is_unique_violation(e):
+                return jsonify({'error': 'This time slot is already booked'}), 409
+            raise
         
         if not result.data:
             return jsonify({'error': 'Appointment not found'}), 404
         
+        # The previous date is unknown here, so recompute the whole business
+        invalidate_business_availability(business_id)
+        bump_business_version(business_id)
+        publish_business_event(business_id, 'appointment_updated', result.data[0])
+        
         return jsonify(result.data[0])
     except Exception as e:
         logger.error(f"Error updating appointment: {e}")
@@ -211,6 +607,10 @@ def delete_appointment(appointment_id):
         if not result.data:
             return jsonify({'error': 'Appointment not found'}), 404
         
+        invalidate_availability_dates(business_id, result.data[0]['appointment_date'])
+        bump_business_version(business_id)
+        publish_business_event(business_id, 'appointment_deleted', {'id': appointment_id})
+        
         return jsonify({'message': 'Appointment deleted successfully'})
     except Exception as e:
         logger.error(f"Error deleting appointment: {e}")
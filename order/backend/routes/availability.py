@@ -2,42 +2,20 @@ from flask import Blueprint, request, jsonify
 from datetime import datetime, date, timedelta
 import uuid
 import logging
-from services.database import DatabaseService
+from services.database import supabase_client
+from services.http_cache import business_validators, not_modified, add_validators
+from services.cache import get_cached_business_hours
+from services.availability_store import get_day_states, get_service_length, active_hold_mask
+from services.availability import (
+    get_day_of_week_key, get_day_of_week_number, slots_to_time_ranges,
+    mask_to_times, past_slots_mask, bookable_start_mask
+)
 
 availability_bp = Blueprint('availability', __name__)
 logger = logging.getLogger(__name__)
 
-# Initialize database service
-try:
-    db_service = DatabaseService()
-    supabase = db_service.get_supabase_client()
-except Exception as e:
-    logger.error(f"Failed to initialize database service: {e}")
-    db_service = None
-    supabase = None
-
-def get_day_of_week_key(date_obj):
-    """Convert date to day key used in business hours"""
-    day_map = {
-        0: 'monday',    # Monday
-        1: 'tuesday',   # Tuesday  
-        2: 'wednesday', # Wednesday
-        3: 'thursday',  # Thursday
-        4: 'friday',    # Friday
-        5: 'saturday',  # Saturday
-        6: 'sunday'     # Sunday
-    }
-    return day_map.get(date_obj.weekday(), 'sunday')
-
-def slots_to_time_ranges(selected_slots):
-    """Convert slot numbers to HH:MM time strings"""
-    times = []
-    for slot in selected_slots:
-        # Each slot is 30 minutes, starting from 5:00 AM (slot 0)
-        hour = 5 + (slot // 2)
-        minute = (slot % 2) * 30
-        times.append(f"{hour:02d}:{minute:02d}")
-    return times
+# Shared Supabase client, created on first use
+supabase = supabase_client
 
 @availability_bp.route('/business/<business_id>/date/<date_str>', methods=['GET'])
 def get_available_slots(business_id, date_str):
@@ -52,78 +30,62 @@ def get_available_slots(business_id, date_str):
         except ValueError:
             return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
         
+        length = get_service_length(supabase, business_id, request.args.get('service_id'))
+        if length is None:
+            return jsonify({'error': 'Service not found'}), 404
+        
         # Don't allow booking in the past
-        if target_date < date.today():
+        now = datetime.now()
+        if target_date < now.date():
             return jsonify({'available_slots': []})
         
-        # Get day of week for business hours lookup
-        day_key = get_day_of_week_key(target_date)
-        day_number = {
-            'monday': 1, 'tuesday': 2, 'wednesday': 3, 'thursday': 4,
-            'friday': 5, 'saturday': 6, 'sunday': 0
-        }.get(day_key, 0)
+        # The materialized day (closed flag, open, booked and held slots)
+        day_state = get_day_states(supabase, business_id, target_date, target_date)[date_str]
+        held_mask = active_hold_mask(day_state)
+        
+        # Past-time filtering and expiring holds make the body depend on the current time too
+        etag, last_modified = business_validators(business_id, now.date(), past_slots_mask(now), held_mask)
+        cached_response = not_modified(etag, last_modified)
+        if cached_response:
+            return cached_response
         
         # Step 1: Get business hours for this day
-        hours_result = supabase.table('business_hours').select('*').eq('business_id', business_id).eq('day_of_week', day_number).execute()
+        day_key = get_day_of_week_key(target_date)
+        day_number = get_day_of_week_number(target_date)
+        day_hours = [hour for hour in get_cached_business_hours(supabase, business_id) if hour['day_of_week'] == day_number]
         
         business_hours = None
-        if hours_result.data:
-            business_hours = hours_result.data[0]
+        if day_hours:
+            business_hours = day_hours[0]
         
         # If no business hours set or day is closed, return empty
         if not business_hours or business_hours.get('is_closed', False):
             return jsonify({'available_slots': []})
         
-        # Get selected time slots for this day
         selected_slots = business_hours.get('selected_slots', [])
         if not selected_slots:
             return jsonify({'available_slots': []})
         
-        # Convert slots to time strings
-        available_times = slots_to_time_ranges(selected_slots)
+        # Step 2: Check the materialized day
+        if day_state['closed']:
+            # Date is specifically closed
+            return jsonify({'available_slots': []})
         
-        # Step 2: Check if this specific date is marked as closed
-        try:
-            closed_result = supabase.table('closed_dates').select('*').eq('business_id', business_id).eq('closed_date', date_str).execute()
-            if closed_result.data:
-                # Date is specifically closed
-                return jsonify({'available_slots': []})
-        except Exception as e:
-            # If closed_dates table doesn't exist, continue without checking
-            logger.warning(f"Could not check closed dates: {e}")
-        
-        # Step 3: Get existing appointments for this date
-        appointments_result = supabase.table('appointments').select('appointment_time').eq('business_id', business_id).eq('appointment_date', date_str).execute()
-        
-        booked_times = set()
-        if appointments_result.data:
-            for apt in appointments_result.data:
-                apt_time = apt.get('appointment_time', '')
-                if apt_time:
-                    # Normalize to HH:MM format
-                    booked_times.add(apt_time[:5])
-        
-        # Step 4: Filter out booked times
-        available_slots = [time for time in available_times if time not in booked_times]
-        
-        # Step 5: If it's today, filter out past times
-        if target_date == date.today():
-            current_time = datetime.now().time()
-            available_slots = [
-                time for time in available_slots 
-                if datetime.strptime(time, '%H:%M').time() > current_time
-            ]
+        # Step 3: Keep start times with room for the service, dropping held and past times
+        booked_mask = day_state['booked_mask']
+        available_mask = bookable_start_mask(target_date, day_state['open_mask'], booked_mask | held_mask, now, length)
+        available_slots = mask_to_times(available_mask)
         
-        return jsonify({
+        return add_validators(jsonify({
             'available_slots': available_slots,
             'business_hours': {
                 'day': day_key,
                 'is_open': not business_hours.get('is_closed', False),
                 'selected_slots': selected_slots
             },
-            'booked_times': list(booked_times),
+            'booked_times': mask_to_times(booked_mask),
             'date': date_str
-        })
+        }), etag, last_modified)
         
     except Exception as e:
         logger.error(f"Error getting available slots: {e}")
@@ -156,77 +118,44 @@ def get_available_slots_range(business_id):
         if (end_date - start_date).days > 30:
             return jsonify({'error': 'Date range cannot exceed 30 days'}), 400
         
-        # Get availability for each date in range
+        length = get_service_length(supabase, business_id, request.args.get('service_id'))
+        if length is None:
+            return jsonify({'error': 'Service not found'}), 404
+        
+        now = datetime.now()
+        
+        # Materialized days come from the cache; any missing days are loaded
+        # together with at most four queries regardless of range length.
+        first_bookable_date = max(start_date, now.date())
+        
+        day_states = {}
+        if first_bookable_date <= end_date:
+            day_states = get_day_states(supabase, business_id, first_bookable_date, end_date)
+        held_masks = {date_str: active_hold_mask(day_state) for date_str, day_state in day_states.items()}
+        
+        etag, last_modified = business_validators(business_id, now.date(), past_slots_mask(now), sorted(held_masks.items()))
+        cached_response = not_modified(etag, last_modified)
+        if cached_response:
+            return cached_response
+        
         availability_by_date = {}
         current_date = start_date
-        
         while current_date <= end_date:
             date_str = current_date.strftime('%Y-%m-%d')
-            
-            # Use the single date endpoint logic
-            try:
-                # This is a bit of a hack - we're calling our own endpoint internally
-                # In a real app, you'd extract the logic to a shared function
-                day_key = get_day_of_week_key(current_date)
-                day_number = {
-                    'monday': 1, 'tuesday': 2, 'wednesday': 3, 'thursday': 4,
-                    'friday': 5, 'saturday': 6, 'sunday': 0
-                }.get(day_key, 0)
-                
-                # Get business hours
-                hours_result = supabase.table('business_hours').select('*').eq('business_id', business_id).eq('day_of_week', day_number).execute()
-                
-                if not hours_result.data or hours_result.data[0].get('is_closed', False):
-                    availability_by_date[date_str] = []
-                else:
-                    business_hours = hours_result.data[0]
-                    selected_slots = business_hours.get('selected_slots', [])
-                    available_times = slots_to_time_ranges(selected_slots)
-                    
-                    # Check closed dates
-                    try:
-                        closed_result = supabase.table('closed_dates').select('*').eq('business_id', business_id).eq('closed_date', date_str).execute()
-                        if closed_result.data:
-                            availability_by_date[date_str] = []
-                            current_date += timedelta(days=1)
-                            continue
-                    except:
-                        pass
-                    
-                    # Get appointments
-                    appointments_result = supabase.table('appointments').select('appointment_time').eq('business_id', business_id).eq('appointment_date', date_str).execute()
-                    
-                    booked_times = set()
-                    if appointments_result.data:
-                        for apt in appointments_result.data:
-                            apt_time = apt.get('appointment_time', '')
-                            if apt_time:
-                                booked_times.add(apt_time[:5])
-                    
-                    # Filter available times
-                    available_slots = [time for time in available_times if time not in booked_times]
-                    
-                    # Filter past times if today
-                    if current_date == date.today():
-                        current_time = datetime.now().time()
-                        available_slots = [
-                            time for time in available_slots 
-                            if datetime.strptime(time, '%H:%M').time() > current_time
-                        ]
-                    
-                    availability_by_date[date_str] = available_slots
-                    
-            except Exception as e:
-                logger.error(f"Error processing date {date_str}: {e}")
+            day_state = day_states.get(date_str)
+            if day_state:
+                taken_mask = day_state['booked_mask'] | held_masks[date_str]
+                available_mask = bookable_start_mask(current_date, day_state['open_mask'], taken_mask, now, length)
+                availability_by_date[date_str] = mask_to_times(available_mask)
+            else:
                 availability_by_date[date_str] = []
-            
             current_date += timedelta(days=1)
         
-        return jsonify({
+        return add_validators(jsonify({
             'availability': availability_by_date,
             'start_date': start_date_str,
             'end_date': end_date_str
-        })
+        }), etag, last_modified)
         
     except Exception as e:
         logger.error(f"Error getting availability range: {e}")
@@ -240,11 +169,11 @@ def get_business_availability_summary(business_id):
             return jsonify({'error': 'Database connection not available'}), 500
         
         # Get all business hours
-        hours_result = supabase.table('business_hours').select('*').eq('business_id', business_id).execute()
+        business_hours = get_cached_business_hours(supabase, business_id)
         
         # Convert to day-based format
         hours_by_day = {}
-        for hour in hours_result.data:
+        for hour in business_hours:
             day_map = {
                 0: 'sunday', 1: 'monday', 2: 'tuesday', 3: 'wednesday',
                 4: 'thursday', 5: 'friday', 6: 'saturday'
@@ -2,19 +2,17 @@ from flask import Blueprint, request, jsonify
 from datetime import datetime
 import uuid
 import logging
-from services.database import DatabaseService
+from services.database import supabase_client
+from services.http_cache import business_validators, not_modified, add_validators, bump_business_version
+from services.cache import get_cached_business_hours, invalidate_business_hours
+from services.availability_store import invalidate_business_availability
+from services.availability import build_weekly_masks, mask_to_slots
 
 business_hours_bp = Blueprint('business_hours', __name__)
 logger = logging.getLogger(__name__)
 
-# Initialize database service
-try:
-    db_service = DatabaseService()
-    supabase = db_service.get_supabase_client()
-except Exception as e:
-    logger.error(f"Failed to initialize database service: {e}")
-    db_service = None
-    supabase = None
+# Shared Supabase client, created on first use
+supabase = supabase_client
 
 @business_hours_bp.route('/business/<business_id>', methods=['GET'])
 def get_business_hours(business_id):
@@ -23,8 +21,12 @@ def get_business_hours(business_id):
         if not supabase:
             return jsonify({'error': 'Database connection not available'}), 500
         
-        result = supabase.table('business_hours').select('*').eq('business_id', business_id).execute()
-        business_hours = result.data
+        etag, last_modified = business_validators(business_id)
+        cached_response = not_modified(etag, last_modified)
+        if cached_response:
+            return cached_response
+        
+        business_hours = get_cached_business_hours(supabase, business_id)
         
         # Convert to the format expected by the frontend
         hours_by_day = {}
@@ -53,7 +55,7 @@ def get_business_hours(business_id):
                     'isOpen': day != 'sunday'  # Default: open Monday-Saturday, closed Sunday
                 }
         
-        return jsonify(hours_by_day)
+        return add_validators(jsonify(hours_by_day), etag, last_modified)
     except Exception as e:
         logger.error(f"Error fetching business hours: {e}")
         return jsonify({'error': 'Failed to fetch business hours'}), 500
@@ -111,9 +113,17 @@ def update_business_hours(business_id):
             if not result.data:
                 logger.error(f"Failed to save hours for day {day_name}")
         
+        invalidate_business_hours(business_id)
+        invalidate_business_availability(business_id)
+        bump_business_version(business_id)
+        
         return jsonify({'message': 'Business hours updated successfully'})
     except Exception as e:
         logger.error(f"Error updating business hours: {e}")
+        # Some days may have been written before the failure
+        invalidate_business_hours(business_id)
+        invalidate_business_availability(business_id)
+        bump_business_version(business_id)
         return jsonify({'error': 'Failed to update business hours'}), 500
 
 @business_hours_bp.route('/business/<business_id>/day/<day_name>', methods=['PUT'])
@@ -159,9 +169,17 @@ def update_single_day_hours(business_id, day_name):
             # Insert new record
             result = supabase.table('business_hours').insert(hour_data).execute()
         
+        invalidate_business_hours(business_id)
+        invalidate_business_availability(business_id)
+        bump_business_version(business_id)
+        
         return jsonify({'message': f'Business hours updated for {day_name}'})
     except Exception as e:
         logger.error(f"Error updating business hours for {day_name}: {e}")
+        # Some days may have been written before the failure
+        invalidate_business_hours(business_id)
+        invalidate_business_availability(business_id)
+        bump_business_version(business_id)
         return jsonify({'error': f'Failed to update business hours for {day_name}'}), 500
 
 @business_hours_bp.route('/business/<business_id>/available-slots', methods=['GET'])
@@ -172,17 +190,16 @@ def get_available_time_slots(business_id):
             return jsonify({'error': 'Database connection not available'}), 500
         
         # Get business hours
-        result = supabase.table('business_hours').select('*').eq('business_id', business_id).execute()
-        business_hours = result.data
+        business_hours = get_cached_business_hours(supabase, business_id)
         
         # Convert to a more usable format
         available_slots = {}
         day_map = {0: 'sunday', 1: 'monday', 2: 'tuesday', 3: 'wednesday', 4: 'thursday', 5: 'friday', 6: 'saturday'}
         
-        for hour in business_hours:
-            day_name = day_map.get(hour['day_of_week'])
-            if day_name and not hour.get('is_closed', False):
-                available_slots[day_name] = hour.get('selected_slots', [])
+        for day_of_week, open_mask in build_weekly_masks(business_hours).items():
+            day_name = day_map.get(day_of_week)
+            if day_name:
+                available_slots[day_name] = mask_to_slots(open_mask)
         
         return jsonify(available_slots)
     except Exception as e:
@@ -197,6 +214,9 @@ def delete_business_hours(business_id):
             return jsonify({'error': 'Database connection not available'}), 500
         
         result = supabase.table('business_hours').delete().eq('business_id', business_id).execute()
+        invalidate_business_hours(business_id)
+        invalidate_business_availability(business_id)
+        bump_business_version(business_id)
         
         return jsonify({'message': 'Business hours deleted successfully'})
     except Exception as e:
@@ -1,23 +1,31 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response
 from datetime import datetime
 import uuid
 import logging
-from services.database import DatabaseService
-from services.qr_service import QRCodeService
-import requests
+from services.database import supabase_client
+from services.http_cache import business_validators, not_modified, add_validators, bump_business_version
+from services.qr_service import QRCodeService, business_booking_url
+from services.qr_cache import get_qr_cache
+from services.qr_render import qr_code_to_png
+from services.qr_jobs import enqueue_qr_code
+from services.http_client import get_http_session
+from services.cache import (
+    get_cached_business_by_slug, invalidate_business_slug,
+    invalidate_business_hours, invalidate_business_services
+)
+from services.availability_store import invalidate_business_availability
+from services.pagination import get_page_args, paginate, page_response
 from config import Config
 
 business_bp = Blueprint('businesses', __name__)
 logger = logging.getLogger(__name__)
 
-# Initialize database service
-try:
-    db_service = DatabaseService()
-    supabase = db_service.get_supabase_client()
-except Exception as e:
-    logger.error(f"Failed to initialize database service: {e}")
-    db_service = None
-    supabase = None
+# Columns returned by the business list (never password_hash)
+BUSINESS_LIST_COLUMNS = 'id, name, slug, category, description, address, phone, email, is_active'
+BUSINESS_SORT_COLUMNS = ['id']
+
+# Shared Supabase client, created on first use
+supabase = supabase_client
 
 # Initialize QR code service
 try:
@@ -28,19 +36,19 @@ except Exception as e:
 
 @business_bp.route('/', methods=['GET'])
 def get_businesses():
-    """Get all businesses"""
+    """Get a page of businesses (?limit=, ?after=<next_cursor>)"""
     try:
         if not supabase:
             return jsonify({'error': 'Database connection not available'}), 500
         
-        result = supabase.table('businesses').select('*').execute()
-        businesses = result.data
-        
-        # Remove password_hash from response
-        for business in businesses:
-            business.pop('password_hash', None)
+        try:
+            limit, after = get_page_args()
+            query = paginate(supabase.table('businesses').select(BUSINESS_LIST_COLUMNS), BUSINESS_SORT_COLUMNS, limit, after)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        return jsonify(businesses)
+        result = query.execute()
+        return jsonify(page_response(result.data, BUSINESS_SORT_COLUMNS, limit))
     except Exception as e:
         logger.error(f"Error fetching businesses: {e}")
         return jsonify({'error': 'Failed to fetch businesses'}), 500
@@ -52,20 +60,25 @@ def get_business_by_slug(slug):
         if not supabase:
             return jsonify({'error': 'Database connection not available'}), 500
         
-        result = supabase.table('businesses').select('*').eq('slug', slug).execute()
+        cached_business = get_cached_business_by_slug(supabase, slug)
         
-        if not result.data:
+        if not cached_business:
             return jsonify({'error': 'Business not found'}), 404
         
-        business = result.data[0]
-        business.pop('password_hash', None)
+        etag, last_modified = business_validators(cached_business['id'])
+        cached_response = not_modified(etag, last_modified)
+        if cached_response:
+            return cached_response
+        
+        # Copy so the cached row is not modified
+        business = dict(cached_business)
         
         # Get QR code URL if available
         if qr_service:
             qr_url = qr_service.get_business_qr_code_download_url(business['id'])
             business['qr_code_url'] = qr_url
         
-        return jsonify(business)
+        return add_validators(jsonify(business), etag, last_modified)
     except Exception as e:
         logger.error(f"Error fetching business by slug: {e}")
         return jsonify({'error': 'Failed to fetch business'}), 500
@@ -77,6 +90,11 @@ def get_business_by_id(business_id):
         if not supabase:
             return jsonify({'error': 'Database connection not available'}), 500
         
+        etag, last_modified = business_validators(business_id)
+        cached_response = not_modified(etag, last_modified)
+        if cached_response:
+            return cached_response
+        
         result = supabase.table('businesses').select('*').eq('id', business_id).execute()
         
         if not result.data:
@@ -90,11 +108,18 @@ def get_business_by_id(business_id):
             qr_url = qr_service.get_business_qr_code_download_url(business_id)
             business['qr_code_url'] = qr_url
         
-        return jsonify(business)
+        return add_validators(jsonify(business), etag, last_modified)
     except Exception as e:
         logger.error(f"Error fetching business by ID: {e}")
         return jsonify({'error': 'Failed to fetch business'}), 500
 
+def is_duplicate_email(error):
+    """Whether a Supabase error is a violation of the businesses email UNIQUE constraint"""
+    if getattr(error, 'code', None) != '23505':
+        return False
+    # Slugs are unique too; only the email constraint means the business exists
+    return 'email' in f"{getattr(error, 'message', '')} {getattr(error, 'details', '')}"
+
 @business_bp.route('/register', methods=['POST'])
 def register_business():
     """Register a new business"""
@@ -110,12 +135,6 @@ def register_business():
             if not business_data.get(field):
                 return jsonify({'error': f'Missing required field: {field}'}), 400
         
-        # Check if business already exists
-        existing_result = supabase.table('businesses').select('id').eq('email', business_data['email']).execute()
-        
-        if existing_result.data:
-            return jsonify({'error': 'Business with this email already exists'}), 400
-        
         # Create new business
         new_business = {
             'id': str(uuid.uuid4()),
@@ -130,8 +149,13 @@ def register_business():
             'is_active': True
         }
         
-        # Insert into Supabase
-        result = supabase.table('businesses').insert(new_business).execute()
+        # Insert into Supabase; the UNIQUE email constraint rejects an existing business
+        try:
+            result = supabase.table('businesses').insert(new_business).execute()
+        except Exception as e:
+            if is_duplicate_email(e):
+                return jsonify({'error': 'Business with this email already exists'}), 400
+            raise
         
         if not result.data:
             return jsonify({'error': 'Failed to create business'}), 500
@@ -139,21 +163,13 @@ def register_business():
         created_business = result.data[0]
         created_business.pop('password_hash', None)
         
-        # Generate and upload QR code
+        # Generate and upload the QR code in the background
         if qr_service:
             try:
-                qr_url = qr_service.generate_business_qr_code(
-                    created_business['id'],
-                    created_business['slug'],
-                    created_business['name']
-                )
-                if qr_url:
-                    created_business['qr_code_url'] = qr_url
-                    logger.info(f"QR code generated for business: {created_business['id']}")
-                else:
-                    logger.warning(f"Failed to generate QR code for business: {created_business['id']}")
+                enqueue_qr_code(created_business['id'], created_business['slug'], created_business['name'])
+                created_business['qr_code_url'] = qr_service.get_business_qr_code_download_url(created_business['id'])
             except Exception as qr_error:
-                logger.error(f"Error generating QR code: {qr_error}")
+                logger.error(f"Error queueing QR code: {qr_error}")
                 # Don't fail business creation if QR code generation fails
         
         return jsonify(created_business), 201
@@ -213,6 +229,21 @@ def update_business(business_id):
         # Remove password_hash from updates if present
         updates.pop('password_hash', None)
         
+        if 'notification_digest_minutes' in updates:
+            try:
+                updates['notification_digest_minutes'] = int(updates['notification_digest_minutes'] or 0)
+            except (TypeError, ValueError):
+                updates['notification_digest_minutes'] = -1
+            if updates['notification_digest_minutes'] < 0:
+                return jsonify({'error': 'notification_digest_minutes must be a non-negative number of minutes'}), 400
+        
+        # Remember the current slug so its cache entry can be dropped if it changes
+        old_slug = None
+        if 'slug' in updates:
+            existing_result = supabase.table('businesses').select('slug').eq('id', business_id).execute()
+            if existing_result.data:
+                old_slug = existing_result.data[0]['slug']
+        
         result = supabase.table('businesses').update(updates).eq('id', business_id).execute()
         
         if not result.data:
@@ -220,24 +251,17 @@ def update_business(business_id):
         
         updated_business = result.data[0]
         updated_business.pop('password_hash', None)
+        invalidate_business_slug(old_slug, updated_business.get('slug'))
+        bump_business_version(business_id)
         
-        # Regenerate QR code if slug changed
-        if 'slug' in updates and qr_service:
+        # Regenerate QR code in the background if the slug changed; the
+        # upload replaces the old image, which is served until then
+        if 'slug' in updates and updated_business.get('slug') != old_slug and qr_service:
             try:
-                # Delete old QR code
-                qr_service.delete_business_qr_code(business_id)
-                
-                # Generate new QR code
-                qr_url = qr_service.generate_business_qr_code(
-                    business_id,
-                    updated_business['slug'],
-                    updated_business['name']
-                )
-                if qr_url:
-                    updated_business['qr_code_url'] = qr_url
-                    logger.info(f"QR code regenerated for business: {business_id}")
+                enqueue_qr_code(business_id, updated_business['slug'], updated_business['name'])
+                updated_business['qr_code_url'] = qr_service.get_business_qr_code_download_url(business_id)
             except Exception as qr_error:
-                logger.error(f"Error regenerating QR code: {qr_error}")
+                logger.error(f"Error queueing QR code: {qr_error}")
         
         return jsonify(updated_business)
     except Exception as e:
@@ -264,6 +288,13 @@ def delete_business(business_id):
         if not result.data:
             return jsonify({'error': 'Business not found'}), 404
         
+        # Business hours and services are removed with the business
+        invalidate_business_slug(result.data[0].get('slug'))
+        invalidate_business_hours(business_id)
+        invalidate_business_services(business_id)
+        invalidate_business_availability(business_id)
+        bump_business_version(business_id)
+        
         return jsonify({'message': 'Business deleted successfully'})
     except Exception as e:
         logger.error(f"Error deleting business: {e}")
@@ -286,38 +317,77 @@ def get_business_qr_code(business_id):
         logger.error(f"Error getting QR code: {e}")
         return jsonify({'error': 'Failed to get QR code'}), 500
 
+def get_business_slug(business_id):
+    """Get a business's slug, or None if the business does not exist"""
+    if not supabase:
+        return None
+    business_result = supabase.table('businesses').select('slug').eq('id', business_id).execute()
+    if not business_result.data:
+        return None
+    return business_result.data[0]['slug']
+
 @business_bp.route('/<business_id>/qr-code/image', methods=['GET'])
 def get_business_qr_code_image(business_id):
-    """Serve the actual QR code image file"""
+    """Serve the QR code image as SVG, or as PNG with ?format=png&size=<one of QR_PNG_SIZES>"""
     try:
         if not qr_service:
             return jsonify({'error': 'QR code service not available'}), 500
         
-        # Get the SVG content from Supabase storage
-        filename = f"{business_id}.svg"
-        download_url = f"{Config.SUPABASE_URL}/storage/v1/object/{qr_service.bucket_name}/{filename}"
+        image_format = request.args.get('format', 'svg')
+        if image_format not in ('svg', 'png'):
+            return jsonify({'error': 'format must be svg or png'}), 400
+        
+        variant = 'svg'
+        mimetype = 'image/svg+xml'
+        if image_format == 'png':
+            size = request.args.get('size', Config.QR_PNG_DEFAULT_SIZE, type=int)
+            if size not in Config.QR_PNG_SIZES:
+                return jsonify({'error': f"size must be one of {', '.join(str(s) for s in Config.QR_PNG_SIZES)}"}), 400
+            variant = f"{size}.png"
+            mimetype = 'image/png'
+        
+        # Cached images are looked up by the URL the QR code should point at now
+        slug = get_business_slug(business_id)
+        if not slug:
+            return jsonify({'error': 'Business not found'}), 404
+        target = business_booking_url(slug)
+        
+        qr_cache = get_qr_cache()
+        cached = qr_cache.get(business_id, target, variant)
+        if cached:
+            content, etag = cached
+        elif image_format == 'png':
+            # Rendered locally from the slug, nothing to download
+            content = qr_code_to_png(qr_service.build_qr_code(slug), size)
+            etag = qr_cache.put(business_id, target, content, variant)
+        else:
+            # First request for this image: download it from Supabase storage
+            filename = f"{business_id}.svg"
+            download_url = f"{Config.SUPABASE_URL}/storage/v1/object/{qr_service.bucket_name}/{filename}"
+            
+            headers = {
+                'Authorization': f'Bearer {Config.SUPABASE_SERVICE_KEY}',
+                'apikey': Config.SUPABASE_SERVICE_KEY
+            }
+            
+            response = get_http_session().get(download_url, headers=headers)
+            
+            if response.status_code != 200:
+                return jsonify({'error': 'QR code not found'}), 404
+            
+            content = response.content
+            etag = qr_cache.put(business_id, target, content)
         
         headers = {
-            'Authorization': f'Bearer {Config.SUPABASE_SERVICE_KEY}',
-            'apikey': Config.SUPABASE_SERVICE_KEY
+            'Cache-Control': 'public, max-age=3600',  # Cache for 1 hour
+            'Access-Control-Allow-Origin': '*'
         }
-        
-        # Download the SVG content
-        response = requests.get(download_url, headers=headers)
-        
-        if response.status_code == 200:
-            # Return the SVG content with proper headers
-            from flask import Response
-            return Response(
-                response.content,
-                mimetype='image/svg+xml',
-                headers={
-                    'Cache-Control': 'public, max-age=3600',  # Cache for 1 hour
-                    'Access-Control-Allow-Origin': '*'
-                }
-            )
+        if request.if_none_match.contains(etag):
+            response = Response(status=304, headers=headers)
         else:
-            return jsonify({'error': 'QR code not found'}), 404
+            response = Response(content, mimetype=mimetype, headers=headers)
+        response.set_etag(etag)
+        return response
             
     except Exception as e:
         logger.error(f"Error serving QR code image: {e}")
@@ -2,19 +2,15 @@ from flask import Blueprint, request, jsonify
 from datetime import datetime, date
 import uuid
 import logging
-from services.database import DatabaseService
+from services.database import supabase_client
+from services.http_cache import business_validators, not_modified, add_validators, bump_business_version
+from services.availability_store import invalidate_availability_dates
 
 closed_dates_bp = Blueprint('closed_dates', __name__)
 logger = logging.getLogger(__name__)
 
-# Initialize database service
-try:
-    db_service = DatabaseService()
-    supabase = db_service.get_supabase_client()
-except Exception as e:
-    logger.error(f"Failed to initialize database service: {e}")
-    db_service = None
-    supabase = None
+# Shared Supabase client, created on first use
+supabase = supabase_client
 
 @closed_dates_bp.route('/business/<business_id>', methods=['GET'])
 def get_closed_dates(business_id):
@@ -23,13 +19,18 @@ def get_closed_dates(business_id):
         if not supabase:
             return jsonify({'error': 'Database connection not available'}), 500
         
+        etag, last_modified = business_validators(business_id)
+        cached_response = not_modified(etag, last_modified)
+        if cached_response:
+            return cached_response
+        
         result = supabase.table('closed_dates').select('*').eq('business_id', business_id).execute()
         closed_dates = result.data
         
         # Convert to a simple list of date strings
         closed_date_list = [item['closed_date'] for item in closed_dates]
         
-        return jsonify({'closed_dates': closed_date_list})
+        return add_validators(jsonify({'closed_dates': closed_date_list}), etag, last_modified)
     except Exception as e:
         logger.error(f"Error fetching closed dates: {e}")
         return jsonify({'error': 'Failed to fetch closed dates'}), 500
@@ -62,6 +63,8 @@ def add_closed_date(business_id):
         }
         
         result = supabase.table('closed_dates').insert(closed_data).execute()
+        invalidate_availability_dates(business_id, closed_date)
+        bump_business_version(business_id)
         
         if result.data:
             return jsonify({'message': 'Closed date added successfully', 'data': result.data[0]})
@@ -90,6 +93,8 @@ def remove_closed_date(business_id, date_str):
         
         # Delete the closed date
         result = supabase.table('closed_dates').delete().eq('business_id', business_id).eq('closed_date', date_str).execute()
+        invalidate_availability_dates(business_id, date_str)
+        bump_business_version(business_id)
         
         return jsonify({'message': 'Closed date removed successfully'})
         
@@ -146,6 +151,9 @@ def update_closed_dates_bulk(business_id):
             for date_str in dates_to_remove:
                 supabase.table('closed_dates').delete().eq('business_id', business_id).eq('closed_date', date_str).execute()
         
+        invalidate_availability_dates(business_id, *(dates_to_add | dates_to_remove))
+        bump_business_version(business_id)
+        
         return jsonify({
             'message': 'Closed dates updated successfully',
             'added': len(dates_to_add),
@@ -2,29 +2,45 @@ from flask import Blueprint, request, jsonify
 from datetime import datetime
 import uuid
 import logging
-from services.database import DatabaseService
+from services.database import supabase_client
+from services.pagination import get_page_args, paginate, page_response
+from services.http_cache import bump_business_version
 
 customers_bp = Blueprint('customers', __name__)
 logger = logging.getLogger(__name__)
 
-# Initialize database service
-try:
-    db_service = DatabaseService()
-    supabase = db_service.get_supabase_client()
-except Exception as e:
-    logger.error(f"Failed to initialize database service: {e}")
-    db_service = None
-    supabase = None
+# Columns returned by the customer list (never password_hash)
+CUSTOMER_LIST_COLUMNS = 'id, name, email, phone'
+CUSTOMER_SORT_COLUMNS = ['id']
+
+# Shared Supabase client, created on first use
+supabase = supabase_client
+
+def get_customer_business_ids(customer_id):
+    """Ids of the businesses with appointments for a customer"""
+    result = supabase.table('appointments').select('business_id').eq('customer_id', customer_id).execute()
+    return {row['business_id'] for row in result.data}
+
+def bump_customer_businesses(business_ids):
+    """Invalidate the appointment lists that embed a customer's name, email and phone"""
+    for business_id in business_ids:
+        bump_business_version(business_id)
 
 @customers_bp.route('/', methods=['GET'])
 def get_customers():
-    """Get all customers"""
+    """Get a page of customers (?limit=, ?after=<next_cursor>)"""
     try:
         if not supabase:
             return jsonify({'error': 'Database connection not available'}), 500
         
-        result = supabase.table('customers').select('*').execute()
-        return jsonify(result.data)
+        try:
+            limit, after = get_page_args()
+            query = paginate(supabase.table('customers').select(CUSTOMER_LIST_COLUMNS), CUSTOMER_SORT_COLUMNS, limit, after)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        result = query.execute()
+        return jsonify(page_response(result.data, CUSTOMER_SORT_COLUMNS, limit))
     except Exception as e:
         logger.error(f"Error fetching customers: {e}")
         return jsonify({'error': 'Failed to fetch customers'}), 500
@@ -101,6 +117,7 @@ def update_customer(customer_id):
         if not result.data:
             return jsonify({'error': 'Customer not found'}), 404
         
+        bump_customer_businesses(get_customer_business_ids(customer_id))
         return jsonify(result.data[0])
     except Exception as e:
         logger.error(f"Error updating customer: {e}")
@@ -113,11 +130,14 @@ def delete_customer(customer_id):
         if not supabase:
             return jsonify({'error': 'Database connection not available'}), 500
         
+        # Read before deleting: the appointments' customer_id is set to null
+        business_ids = get_customer_business_ids(customer_id)
         result = supabase.table('customers').delete().eq('id', customer_id).execute()
         
         if not result.data:
             return jsonify({'error': 'Customer not found'}), 404
         
+        bump_customer_businesses(business_ids)
         return jsonify({'message': 'Customer deleted successfully'})
     except Exception as e:
         logger.error(f"Error deleting customer: {e}")
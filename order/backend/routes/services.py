@@ -2,19 +2,16 @@ from flask import Blueprint, request, jsonify
 from datetime import datetime
 import uuid
 import logging
-from services.database import DatabaseService
+from services.database import supabase_client
+from services.http_cache import business_validators, not_modified, add_validators, bump_business_version
+from services.cache import get_cached_business_services, invalidate_business_services
+from services.availability_store import invalidate_business_availability
 
 services_bp = Blueprint('services', __name__)
 logger = logging.getLogger(__name__)
 
-# Initialize database service
-try:
-    db_service = DatabaseService()
-    supabase = db_service.get_supabase_client()
-except Exception as e:
-    logger.error(f"Failed to initialize database service: {e}")
-    db_service = None
-    supabase = None
+# Shared Supabase client, created on first use
+supabase = supabase_client
 
 @services_bp.route('/business/<business_id>', methods=['GET'])
 def get_business_services(business_id):
@@ -23,9 +20,14 @@ def get_business_services(business_id):
         if not supabase:
             return jsonify({'error': 'Database connection not available'}), 500
         
-        result = supabase.table('services').select('*').eq('business_id', business_id).eq('is_active', True).execute()
+        etag, last_modified = business_validators(business_id)
+        cached_response = not_modified(etag, last_modified)
+        if cached_response:
+            return cached_response
         
-        return jsonify(result.data)
+        services = get_cached_business_services(supabase, business_id)
+        
+        return add_validators(jsonify(services), etag, last_modified)
     except Exception as e:
         logger.error(f"Error fetching services: {e}")
         return jsonify({'error': 'Failed to fetch services'}), 500
@@ -78,6 +80,9 @@ def create_service():
         if not result.data:
             return jsonify({'error': 'Failed to create service'}), 500
         
+        invalidate_business_services(new_service['business_id'])
+        bump_business_version(new_service['business_id'])
+        
         return jsonify(result.data[0]), 201
     except Exception as e:
         logger.error(f"Error creating service: {e}")
@@ -98,6 +103,12 @@ def update_service(service_id):
         if not result.data:
             return jsonify({'error': 'Service not found'}), 404
         
+        invalidate_business_services(result.data[0]['business_id'])
+        if 'duration' in updates:
+            # Booked slot masks depend on each booking's service duration
+            invalidate_business_availability(result.data[0]['business_id'])
+        bump_business_version(result.data[0]['business_id'])
+        
         return jsonify(result.data[0])
     except Exception as e:
         logger.error(f"Error updating service: {e}")
@@ -115,6 +126,9 @@ def delete_service(service_id):
         if not result.data:
             return jsonify({'error': 'Service not found'}), 404
         
+        invalidate_business_services(result.data[0]['business_id'])
+        bump_business_version(result.data[0]['business_id'])
+        
         return jsonify({'message': 'Service deleted successfully'})
     except Exception as e:
         logger.error(f"Error deleting service: {e}")
@@ -2,19 +2,13 @@ from flask import Blueprint, request, jsonify
 from datetime import datetime, timedelta
 import uuid
 import logging
-from services.database import DatabaseService
+from services.database import supabase_client
 
 time_slots_bp = Blueprint('time_slots', __name__)
 logger = logging.getLogger(__name__)
 
-# Initialize database service
-try:
-    db_service = DatabaseService()
-    supabase = db_service.get_supabase_client()
-except Exception as e:
-    logger.error(f"Failed to initialize database service: {e}")
-    db_service = None
-    supabase = None
+# Shared Supabase client, created on first use
+supabase = supabase_client
 
 @time_slots_bp.route('/business/<business_id>/available', methods=['GET'])
 def get_available_slots(business_id):
@@ -0,0 +1,147 @@
+from datetime import datetime
+
+# Business hours are stored as 30-minute slot numbers starting at 5:00 AM
+# (slot 0 = 5:00 AM, slot 37 = 11:30 PM), see migrations/update_business_hours.sql
+SLOT_START_HOUR = 5
+SLOT_MINUTES = 30
+SLOTS_PER_DAY = 38
+
+# Internally a day is an integer bitmask where bit N set means slot N.
+# Availability for a day is then open & ~booked & ~past, and HH:MM strings
+# are only produced when serializing the response. A booking marks every
+# slot its service's duration covers, and a service needing N slots can only
+# start where N consecutive slots are free (see fit_start_mask).
+ALL_SLOTS_MASK = (1 << SLOTS_PER_DAY) - 1
+
+DAY_KEYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+def get_day_of_week_key(date_obj):
+    """Convert date to day key used in business hours"""
+    return DAY_KEYS[date_obj.weekday()]
+
+def get_day_of_week_number(date_obj):
+    """Convert date to the business_hours day_of_week number (0=Sunday)"""
+    return (date_obj.weekday() + 1) % 7
+
+def slot_to_time(slot):
+    """Convert a slot number to an HH:MM time string"""
+    hour = SLOT_START_HOUR + (slot // 2)
+    minute = (slot % 2) * SLOT_MINUTES
+    return f"{hour:02d}:{minute:02d}"
+
+SLOT_TIMES = [slot_to_time(slot) for slot in range(SLOTS_PER_DAY)]
+TIME_TO_SLOT = {time: slot for slot, time in enumerate(SLOT_TIMES)}
+
+def slots_to_time_ranges(selected_slots):
+    """Convert slot numbers to HH:MM time strings"""
+    return [slot_to_time(slot) for slot in selected_slots]
+
+def slots_to_mask(selected_slots):
+    """Convert a list of slot numbers to a bitmask, ignoring out-of-range slots"""
+    mask = 0
+    for slot in selected_slots:
+        if 0 <= slot < SLOTS_PER_DAY:
+            mask |= 1 << slot
+    return mask
+
+def mask_to_slots(mask):
+    """Convert a bitmask back to an ascending list of slot numbers"""
+    return [slot for slot in range(SLOTS_PER_DAY) if mask >> slot & 1]
+
+def mask_to_times(mask):
+    """Convert a bitmask to ascending HH:MM time strings"""
+    return [SLOT_TIMES[slot] for slot in range(SLOTS_PER_DAY) if mask >> slot & 1]
+
+def time_to_slot(time_str):
+    """Convert an HH:MM or HH:MM:SS string to its slot number, or None if off the grid"""
+    return TIME_TO_SLOT.get(time_str[:5])
+
+def duration_to_slots(duration):
+    """Number of slots a service of duration minutes occupies (at least one)"""
+    try:
+        minutes = int(duration or 0)
+    except (TypeError, ValueError):
+        minutes = 0
+    return max(1, -(-minutes // SLOT_MINUTES))
+
+def run_mask(start_slot, length):
+    """Bitmask of length consecutive slots beginning at start_slot, cut off at the end of the day"""
+    return (((1 << length) - 1) << start_slot) & ALL_SLOTS_MASK
+
+def fit_start_mask(free_mask, length):
+    """Slots of free_mask that begin a run of at least length free slots"""
+    starts = free_mask
+    for offset in range(1, length):
+        starts &= free_mask >> offset
+    return starts
+
+def past_slots_mask(now):
+    """Bitmask of the slots that start at or before now's HH:MM"""
+    minutes = (now.hour - SLOT_START_HOUR) * 60 + now.minute
+    if minutes < 0:
+        return 0
+    return ((1 << (minutes // SLOT_MINUTES + 1)) - 1) & ALL_SLOTS_MASK
+
+def build_weekly_masks(business_hours_rows):
+    """Map day_of_week number to the open slot mask for every open day"""
+    weekly_masks = {}
+    for hour in business_hours_rows:
+        if hour.get('is_closed', False):
+            continue
+        open_mask = slots_to_mask(hour.get('selected_slots') or [])
+        if open_mask:
+            weekly_masks[hour['day_of_week']] = open_mask
+    return weekly_masks
+
+def group_booked_masks(appointment_rows):
+    """Group appointment rows into {date_str: booked slot mask}.
+
+    Rows may embed services(duration); each booking then covers every slot
+    of its duration, otherwise just its start slot.
+    """
+    booked_masks_by_date = {}
+    for apt in appointment_rows:
+        slot = time_to_slot(apt.get('appointment_time') or '')
+        if slot is not None:
+            date_str = apt['appointment_date']
+            length = duration_to_slots((apt.get('services') or {}).get('duration'))
+            booked_masks_by_date[date_str] = booked_masks_by_date.get(date_str, 0) | run_mask(slot, length)
+    return booked_masks_by_date
+
+def group_hold_masks(hold_rows):
+    """Group appointment_holds rows into {date_str: [[held slot mask, expiry timestamp], ...]}.
+
+    Each hold covers every slot of its duration_minutes. Expiries are kept
+    so a cached day can drop holds as they run out.
+    """
+    holds_by_date = {}
+    for hold in hold_rows:
+        slot = time_to_slot(hold.get('appointment_time') or '')
+        if slot is not None:
+            mask = run_mask(slot, duration_to_slots(hold.get('duration_minutes')))
+            expires_at = datetime.fromisoformat(hold['expires_at']).timestamp()
+            holds_by_date.setdefault(hold['appointment_date'], []).append([mask, expires_at])
+    return holds_by_date
+
+def compute_open_mask(target_date, weekly_masks, closed_dates):
+    """Return the slots the business is open on target_date (0 if the date is closed)"""
+    if target_date.strftime('%Y-%m-%d') in closed_dates:
+        return 0
+    return weekly_masks.get(get_day_of_week_number(target_date), 0)
+
+def filter_bookable_mask(target_date, free_mask, now):
+    """Drop slots from free_mask that are already in the past relative to now"""
+    today = now.date()
+    if target_date < today:
+        return 0
+
+    # If it's today, filter out past times
+    if target_date == today:
+        return free_mask & ~past_slots_mask(now)
+
+    return free_mask
+
+def bookable_start_mask(target_date, open_mask, booked_mask, now, length=1):
+    """Return the slots on target_date where a length-slot service can start"""
+    starts = fit_start_mask(open_mask & ~booked_mask, length)
+    return filter_bookable_mask(target_date, starts, now)
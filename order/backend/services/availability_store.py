@@ -0,0 +1,174 @@
+import time
+import uuid
+import logging
+from datetime import date, datetime, timedelta, timezone
+from config import Config
+from services.cache import (
+    RedisCache, get_cache, cache_get, cache_set, cache_get_many, cache_set_many, cache_delete,
+    get_cached_business_hours, get_cached_business_services
+)
+from services.availability import (
+    build_weekly_masks, group_booked_masks, group_hold_masks, compute_open_mask, duration_to_slots, bookable_start_mask
+)
+
+logger = logging.getLogger(__name__)
+
+# Materialized availability: one cache entry per (business_id, date) holding
+#   {'closed': bool, 'open_mask': int, 'booked_mask': int, 'holds': [[mask, expires_at], ...]}
+# for dates from today up to AVAILABILITY_HORIZON_DAYS ahead. booked_mask
+# covers each booking's full service duration and holds the slots reserved
+# by customers still filling in the booking form. Past-time filtering, hold
+# expiry and the requested service's length are applied on read, so entries
+# stay valid for the whole day and are shared by every service.
+#
+# Day keys include a per-business generation token. Changes that affect a
+# whole business (hours, bulk appointment edits) swap the token, which
+# orphans every old entry at once; orphans then age out through their TTL.
+#
+# Invalidation only reaches other gunicorn workers through Redis. With the
+# in-memory cache each worker keeps its own days, so they live no longer
+# than ETAG_VERSION_TTL: a booking made through another worker shows up
+# within that time, as does a new ETag for it.
+
+def _generation_key(business_id):
+    return f"availability_gen:{business_id}"
+
+def _day_key(business_id, generation, date_str):
+    return f"availability:{business_id}:{generation}:{date_str}"
+
+def _day_ttl():
+    if isinstance(get_cache(), RedisCache):
+        return Config.AVAILABILITY_CACHE_TTL
+    return min(Config.AVAILABILITY_CACHE_TTL, Config.ETAG_VERSION_TTL)
+
+def _get_generation(business_id):
+    generation = cache_get(_generation_key(business_id))
+    if generation is None:
+        generation = uuid.uuid4().hex[:12]
+        cache_set(_generation_key(business_id), generation, None)
+    return generation
+
+def load_day_states(supabase, business_id, start_date, end_date):
+    """Compute day states for a date range from Supabase with at most four queries"""
+    start_date_str = start_date.strftime('%Y-%m-%d')
+    end_date_str = end_date.strftime('%Y-%m-%d')
+
+    weekly_masks = build_weekly_masks(get_cached_business_hours(supabase, business_id))
+
+    closed_dates = set()
+    try:
+        closed_result = supabase.table('closed_dates').select('closed_date').eq('business_id', business_id).gte('closed_date', start_date_str).lte('closed_date', end_date_str).execute()
+        closed_dates = set(item['closed_date'] for item in closed_result.data)
+    except Exception as e:
+        # If closed_dates table doesn't exist, continue without checking
+        logger.warning(f"Could not check closed dates: {e}")
+
+    appointments_result = supabase.table('appointments').select('appointment_date, appointment_time, services(duration)').eq('business_id', business_id).neq('status', 'cancelled').gte('appointment_date', start_date_str).lte('appointment_date', end_date_str).execute()
+    booked_masks_by_date = group_booked_masks(appointments_result.data)
+
+    holds_by_date = {}
+    try:
+        holds_result = supabase.table('appointment_holds').select('appointment_date, appointment_time, duration_minutes, expires_at').eq('business_id', business_id).gte('appointment_date', start_date_str).lte('appointment_date', end_date_str).gt('expires_at', datetime.now(timezone.utc).isoformat()).execute()
+        holds_by_date = group_hold_masks(holds_result.data)
+    except Exception as e:
+        # If appointment_holds table doesn't exist, continue without holds
+        logger.warning(f"Could not check slot holds: {e}")
+
+    states = {}
+    current_date = start_date
+    while current_date <= end_date:
+        date_str = current_date.strftime('%Y-%m-%d')
+        states[date_str] = {
+            'closed': date_str in closed_dates,
+            'open_mask': compute_open_mask(current_date, weekly_masks, closed_dates),
+            'booked_mask': booked_masks_by_date.get(date_str, 0),
+            'holds': holds_by_date.get(date_str, [])
+        }
+        current_date += timedelta(days=1)
+
+    return states
+
+def get_day_states(supabase, business_id, start_date, end_date):
+    """Get {date_str: day state} for a date range, reading materialized days from the cache.
+
+    Days missing from the cache are loaded together in one pass and stored
+    if they fall inside the materialization horizon.
+    """
+    today = date.today()
+    horizon_end = today + timedelta(days=Config.AVAILABILITY_HORIZON_DAYS)
+    generation = _get_generation(business_id)
+
+    keys_by_date = {}
+    date_strs = []
+    current_date = start_date
+    while current_date <= end_date:
+        date_str = current_date.strftime('%Y-%m-%d')
+        date_strs.append(date_str)
+        if today <= current_date <= horizon_end:
+            keys_by_date[date_str] = _day_key(business_id, generation, date_str)
+        current_date += timedelta(days=1)
+
+    cached = cache_get_many(list(keys_by_date.values()))
+    states = {
+        date_str: cached[key]
+        for date_str, key in keys_by_date.items()
+        if key in cached
+    }
+
+    missing = [date_str for date_str in date_strs if date_str not in states]
+    if missing:
+        loaded = load_day_states(
+            supabase,
+            business_id,
+            datetime.strptime(missing[0], '%Y-%m-%d').date(),
+            datetime.strptime(missing[-1], '%Y-%m-%d').date()
+        )
+        for date_str in missing:
+            states[date_str] = loaded[date_str]
+        cache_set_many(
+            {keys_by_date[date_str]: loaded[date_str] for date_str in missing if date_str in keys_by_date},
+            _day_ttl()
+        )
+
+    return states
+
+def active_hold_mask(day_state, now=None):
+    """Slots of a day state held by holds that have not expired yet"""
+    now = now or time.time()
+    mask = 0
+    # Entries cached before holds were materialized have no 'holds'
+    for hold_mask, expires_at in day_state.get('holds', []):
+        if expires_at > now:
+            mask |= hold_mask
+    return mask
+
+def get_service_length(supabase, business_id, service_id):
+    """Slots needed by a service of the business, 1 when no service is given, None if it does not exist"""
+    if not service_id:
+        return 1
+    for service in get_cached_business_services(supabase, business_id):
+        if str(service['id']) == str(service_id):
+            return duration_to_slots(service.get('duration'))
+    return None
+
+def is_start_bookable(supabase, business_id, target_date, start_slot, length=1, now=None):
+    """Whether a length-slot booking can start at start_slot on target_date (open, free, unheld and not past)"""
+    date_str = target_date.strftime('%Y-%m-%d')
+    day_state = get_day_states(supabase, business_id, target_date, target_date)[date_str]
+    if day_state['closed']:
+        return False
+    taken_mask = day_state['booked_mask'] | active_hold_mask(day_state)
+    starts = bookable_start_mask(target_date, day_state['open_mask'], taken_mask, now or datetime.now(), length)
+    return bool(starts >> start_slot & 1)
+
+def invalidate_availability_dates(business_id, *date_strs):
+    """Drop the materialized days for a business so they are recomputed on next read"""
+    generation = cache_get(_generation_key(business_id))
+    if generation is None:
+        # Nothing has been materialized under a known generation
+        return
+    cache_delete(*[_day_key(business_id, generation, date_str[:10]) for date_str in date_strs if date_str])
+
+def invalidate_business_availability(business_id):
+    """Drop every materialized day for a business (e.g. after an hours change)"""
+    cache_set(_generation_key(business_id), uuid.uuid4().hex[:12], None)
@@ -0,0 +1,232 @@
+import json
+import time
+import threading
+import logging
+from collections import OrderedDict
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class InMemoryLRUCache:
+    """Thread-safe per-process cache with per-entry TTL and LRU eviction.
+
+    Cached values are shared with callers, so they must not be mutated.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value for key, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        """Store value under key, expiring after ttl seconds (None keeps it until evicted)"""
+        if ttl is not None and ttl <= 0:
+            return
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_many(self, keys):
+        """Return {key: value} for the keys that are cached"""
+        values = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                values[key] = value
+        return values
+
+    def set_many(self, mapping, ttl=None):
+        """Store every key/value pair in mapping with the same ttl"""
+        for key, value in mapping.items():
+            self.set(key, value, ttl)
+
+    def delete(self, *keys):
+        """Drop the cached values for keys"""
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every cached value"""
+        with self._lock:
+            self._entries.clear()
+
+class RedisCache:
+    """Cache stored in a Redis-protocol server so every gunicorn worker shares it.
+
+    Values are JSON encoded. Pass client to use an existing connection such as
+    a fakeredis instance, otherwise one is opened from url.
+    """
+
+    def __init__(self, url=None, client=None, key_prefix='bookly:'):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url)
+            client.ping()
+        self.client = client
+        self.key_prefix = key_prefix
+
+    def get(self, key):
+        """Return the cached value for key, or None if missing or expired"""
+        raw = self.client.get(self.key_prefix + key)
+        if raw is None:
+            return None
+        return json.loads(raw)
+
+    def set(self, key, value, ttl=None):
+        """Store value under key, expiring after ttl seconds (None keeps it until evicted)"""
+        if ttl is not None and ttl <= 0:
+            return
+        self.client.set(self.key_prefix + key, json.dumps(value), ex=ttl)
+
+    def get_many(self, keys):
+        """Return {key: value} for the keys that are cached, in one round trip"""
+        keys = list(keys)
+        if not keys:
+            return {}
+        raw_values = self.client.mget([self.key_prefix + key for key in keys])
+        return {key: json.loads(raw) for key, raw in zip(keys, raw_values) if raw is not None}
+
+    def set_many(self, mapping, ttl=None):
+        """Store every key/value pair in mapping with the same ttl, in one round trip"""
+        if not mapping or (ttl is not None and ttl <= 0):
+            return
+        pipeline = self.client.pipeline(transaction=False)
+        for key, value in mapping.items():
+            pipeline.set(self.key_prefix + key, json.dumps(value), ex=ttl)
+        pipeline.execute()
+
+    def delete(self, *keys):
+        """Drop the cached values for keys"""
+        if keys:
+            self.client.delete(*[self.key_prefix + key for key in keys])
+
+    def clear(self):
+        """Drop every cached value under this cache's key prefix"""
+        keys = list(self.client.scan_iter(match=self.key_prefix + '*'))
+        if keys:
+            self.client.delete(*keys)
+
+def create_cache_backend():
+    """Create the cache backend selected by CACHE_BACKEND ('memory' or 'redis')"""
+    if Config.CACHE_BACKEND == 'redis':
+        try:
+            cache = RedisCache(url=Config.REDIS_URL)
+            logger.info("Using Redis cache backend")
+            return cache
+        except Exception as e:
+            logger.error(f"Failed to connect to Redis cache, falling back to in-memory cache: {e}")
+    return InMemoryLRUCache(max_entries=Config.CACHE_MAX_ENTRIES)
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache():
+    """Get the process-wide cache backend, creating it on first use"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = create_cache_backend()
+    return _cache
+
+# The cache_* helpers swallow backend errors so a cache outage degrades to a
+# Supabase read instead of an error response.
+
+def cache_get(key):
+    """Get key from the cache backend, or None if missing or the backend failed"""
+    try:
+        return get_cache().get(key)
+    except Exception as e:
+        logger.warning(f"Cache read failed for {key}: {e}")
+        return None
+
+def cache_set(key, value, ttl):
+    """Store key in the cache backend, ignoring backend failures"""
+    try:
+        get_cache().set(key, value, ttl)
+    except Exception as e:
+        logger.warning(f"Cache write failed for {key}: {e}")
+
+def cache_get_many(keys):
+    """Get {key: value} for the cached keys, or {} if the backend failed"""
+    try:
+        return get_cache().get_many(keys)
+    except Exception as e:
+        logger.warning(f"Cache read failed for {len(keys)} keys: {e}")
+        return {}
+
+def cache_set_many(mapping, ttl):
+    """Store every key in mapping, ignoring backend failures"""
+    try:
+        get_cache().set_many(mapping, ttl)
+    except Exception as e:
+        logger.warning(f"Cache write failed for {len(mapping)} keys: {e}")
+
+def cache_delete(*keys):
+    """Drop keys from the cache backend, ignoring backend failures"""
+    try:
+        get_cache().delete(*keys)
+    except Exception as e:
+        logger.warning(f"Cache invalidation failed for {keys}: {e}")
+
+def get_cached_business_hours(supabase, business_id):
+    """Get all business_hours rows for a business, querying Supabase on a cache miss"""
+    key = f"business_hours:{business_id}"
+    rows = cache_get(key)
+    if rows is None:
+        result = supabase.table('business_hours').select('*').eq('business_id', business_id).execute()
+        rows = result.data
+        cache_set(key, rows, Config.BUSINESS_HOURS_CACHE_TTL)
+    return rows
+
+def invalidate_business_hours(business_id):
+    """Forget the cached business_hours rows for a business"""
+    cache_delete(f"business_hours:{business_id}")
+
+def get_cached_business_by_slug(supabase, slug):
+    """Get a business row (without password_hash) by slug, or None if it does not exist"""
+    key = f"business_slug:{slug}"
+    business = cache_get(key)
+    if business is None:
+        result = supabase.table('businesses').select('*').eq('slug', slug).execute()
+        if not result.data:
+            return None
+        business = result.data[0]
+        business.pop('password_hash', None)
+        cache_set(key, business, Config.CACHE_TTL)
+    return business
+
+def invalidate_business_slug(*slugs):
+    """Forget the cached business rows for the given slugs"""
+    cache_delete(*[f"business_slug:{slug}" for slug in slugs if slug])
+
+def get_cached_business_services(supabase, business_id):
+    """Get the active services for a business, querying Supabase on a cache miss"""
+    key = f"services:{business_id}"
+    services = cache_get(key)
+    if services is None:
+        result = supabase.table('services').select('*').eq('business_id', business_id).eq('is_active', True).execute()
+        services = result.data
+        cache_set(key, services, Config.CACHE_TTL)
+    return services
+
+def invalidate_business_services(business_id):
+    """Forget the cached services for a business"""
+    cache_delete(f"services:{business_id}")
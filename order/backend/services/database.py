@@ -1,18 +1,27 @@
-from supabase import create_client, Client
 from config import Config
+import os
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
 class DatabaseService:
     def __init__(self):
         Config.validate_supabase_config()
-        self.supabase: Client = create_client(
+        # supabase (with httpx, postgrest, storage...) is the slowest import of the
+        # app, so it is only loaded once the first client is created
+        from supabase import create_client
+        from supabase.lib.client_options import ClientOptions
+        self.supabase = create_client(
             Config.SUPABASE_URL,
-            Config.SUPABASE_KEY
+            Config.SUPABASE_KEY,
+            options=ClientOptions(
+                postgrest_client_timeout=Config.SUPABASE_TIMEOUT_SECONDS,
+                storage_client_timeout=Config.SUPABASE_STORAGE_TIMEOUT_SECONDS
+            )
         )
     
-    def get_supabase_client(self) -> Client:
+    def get_supabase_client(self):
         """Get the Supabase client instance"""
         return self.supabase
     
@@ -133,3 +142,60 @@ class DatabaseService:
             
         except Exception as e:
             logger.error(f"Failed to create sample data: {e}")
+
+# One DatabaseService per process, shared by the app, every blueprint and the
+# background workers. The Supabase client keeps its own keep-alive HTTP
+# connection pool, so sharing it means one pool per worker process instead of
+# one per blueprint, and nothing connects until the first query.
+
+_db_service = None
+_db_service_pid = None
+_db_service_failed = False
+_db_service_lock = threading.Lock()
+
+def get_database_service():
+    """Get this process's shared DatabaseService, creating it on first use.
+
+    Returns None if Supabase is not configured; the failure is logged once.
+    """
+    global _db_service, _db_service_pid, _db_service_failed
+    # A client inherited across fork would share sockets with the parent
+    if _db_service_pid != os.getpid():
+        with _db_service_lock:
+            if _db_service_pid != os.getpid():
+                try:
+                    _db_service = DatabaseService()
+                    _db_service_failed = False
+                    logger.info("Database service initialized successfully")
+                except Exception as e:
+                    if not _db_service_failed:
+                        logger.error(f"Failed to initialize database service: {e}")
+                    _db_service = None
+                    _db_service_failed = True
+                _db_service_pid = os.getpid()
+    return _db_service
+
+def get_supabase():
+    """Get the shared Supabase client, or None if it is unavailable"""
+    db_service = get_database_service()
+    return db_service.get_supabase_client() if db_service else None
+
+class SupabaseClientProxy:
+    """Stands in for the shared Supabase client in modules loaded before it exists.
+
+    Attribute access is forwarded to the client, which is created on first use.
+    The proxy is falsy while no client is available, so the routes'
+    `if not supabase:` checks keep working unchanged.
+    """
+
+    def __bool__(self):
+        return get_supabase() is not None
+
+    def __getattr__(self, name):
+        client = get_supabase()
+        if client is None:
+            raise RuntimeError("Supabase client is not available")
+        return getattr(client, name)
+
+# Imported by the blueprints as their module-level `supabase`
+supabase_client = SupabaseClientProxy()
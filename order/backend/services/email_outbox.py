@@ -0,0 +1,351 @@
+import json
+import time
+import threading
+import logging
+from config import Config
+from services.sqlite_queue import SQLiteQueue, retry_schedule
+
+logger = logging.getLogger(__name__)
+
+# Durable outbox for outgoing email. Requests only insert a row into a local
+# SQLite file; a pool of background threads claims due rows, sends them
+# through EmailService and retries failures with exponential backoff. Rows
+# that run out of attempts stay in the table as 'failed' with their last
+# error instead of being dropped.
+#
+# Each kind maps to the EmailService method that sends it; the stored
+# payload holds that method's keyword arguments.
+#
+# Due emails are sent in priority order and then oldest first. Reminders
+# are queued in bulk, so they go after the confirmations and notifications
+# customers and businesses are waiting for, whatever their queue time.
+#
+# Business notifications for businesses in digest mode are held in a
+# second table instead and folded into one 'business_digest' email once
+# the business's digest window has passed since its first held booking.
+EMAIL_KINDS = {
+    'appointment_confirmation': 'send_appointment_confirmation',
+    'business_notification': 'send_appointment_notification_to_business',
+    'appointment_reminder': 'send_appointment_reminder',
+    'business_digest': 'send_business_digest',
+}
+
+# Lower is sent first; kinds not listed are transactional (0)
+EMAIL_PRIORITIES = {
+    'appointment_reminder': 1,
+}
+
+class EmailOutbox(SQLiteQueue):
+    """SQLite-backed queue of pending emails, safe to share between threads and processes"""
+
+    table = 'email_outbox'
+    claimed_status = 'sending'
+    claim_order = 'priority, next_attempt_at'
+
+    def create_tables(self, conn):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS email_outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                priority INTEGER NOT NULL DEFAULT 0,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                claimed_at REAL,
+                last_error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        # Outboxes created before priorities existed
+        columns = [row['name'] for row in conn.execute('PRAGMA table_info(email_outbox)').fetchall()]
+        if 'priority' not in columns:
+            conn.execute('ALTER TABLE email_outbox ADD COLUMN priority INTEGER NOT NULL DEFAULT 0')
+            conn.executemany('UPDATE email_outbox SET priority = ? WHERE kind = ?', [(priority, kind) for kind, priority in EMAIL_PRIORITIES.items()])
+        conn.execute('DROP INDEX IF EXISTS idx_email_outbox_due')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_email_outbox_claim ON email_outbox(status, priority, next_attempt_at)')
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS email_digest_items (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                business_id TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                due_at REAL NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_email_digest_items_business ON email_digest_items(business_id, due_at)')
+
+    def enqueue(self, kind, payload):
+        """Store an email to be sent and return its outbox id"""
+        if kind not in EMAIL_KINDS:
+            raise ValueError(f"Unknown email kind: {kind}")
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                'INSERT INTO email_outbox (kind, payload, priority, next_attempt_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)',
+                (kind, json.dumps(payload), EMAIL_PRIORITIES.get(kind, 0), now, now, now)
+            )
+            return cursor.lastrowid
+
+    def enqueue_many(self, kind, payloads):
+        """Store many emails of one kind in a single transaction"""
+        if kind not in EMAIL_KINDS:
+            raise ValueError(f"Unknown email kind: {kind}")
+        now = time.time()
+        with self._transaction() as conn:
+            conn.executemany(
+                'INSERT INTO email_outbox (kind, payload, priority, next_attempt_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)',
+                [(kind, json.dumps(payload), EMAIL_PRIORITIES.get(kind, 0), now, now, now) for payload in payloads]
+            )
+
+    def hold_for_digest(self, business_id, payload, window_seconds):
+        """Hold a business notification until the business's next digest is due"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT INTO email_digest_items (business_id, payload, due_at, created_at) VALUES (?, ?, ?, ?)',
+                (business_id, json.dumps(payload), now + window_seconds, now)
+            )
+
+    def flush_due_digests(self):
+        """Turn held notifications into one queued digest email per due business.
+
+        A business is due once its oldest held notification's window has
+        passed. Moving the items into the outbox happens in one transaction,
+        so each held notification ends up in exactly one digest.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            business_ids = [row['business_id'] for row in conn.execute(
+                'SELECT business_id FROM email_digest_items GROUP BY business_id HAVING MIN(due_at) <= ?',
+                (now,)
+            ).fetchall()]
+            for business_id in business_ids:
+                items = conn.execute(
+                    'SELECT id, payload FROM email_digest_items WHERE business_id = ? ORDER BY id',
+                    (business_id,)
+                ).fetchall()
+                notifications = [json.loads(item['payload']) for item in items]
+                digest = {
+                    # The newest copy of the business details wins
+                    'business_data': notifications[-1]['business_data'],
+                    'notifications': notifications
+                }
+                conn.execute(
+                    'INSERT INTO email_outbox (kind, payload, next_attempt_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?)',
+                    ('business_digest', json.dumps(digest), now, now, now)
+                )
+                conn.execute(
+                    f"DELETE FROM email_digest_items WHERE id IN ({','.join('?' * len(items))})",
+                    [item['id'] for item in items]
+                )
+        return len(business_ids)
+
+    def claim(self, limit=1):
+        """Mark up to limit due emails as sending and return them as dicts.
+
+        Emails left 'sending' longer than EMAIL_CLAIM_TIMEOUT_SECONDS (a worker
+        died mid-send) are claimable again.
+        """
+        jobs = self._claim_rows(limit, Config.EMAIL_CLAIM_TIMEOUT_SECONDS)
+        for job in jobs:
+            job['payload'] = json.loads(job['payload'])
+        return jobs
+
+    def mark_sent(self, email_id):
+        """Record a successful send"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE email_outbox SET status = 'sent', last_error = NULL, updated_at = ? WHERE id = ?",
+                (time.time(), email_id)
+            )
+
+    def mark_failed(self, email_id, attempts, error):
+        """Schedule a retry with exponential backoff, or give up after EMAIL_MAX_ATTEMPTS.
+
+        Returns True if the email will be retried.
+        """
+        status, next_attempt_at = retry_schedule(
+            attempts, Config.EMAIL_MAX_ATTEMPTS, Config.EMAIL_RETRY_BASE_SECONDS, Config.EMAIL_RETRY_MAX_SECONDS
+        )
+        with self._connect() as conn:
+            conn.execute(
+                'UPDATE email_outbox SET status = ?, next_attempt_at = ?, last_error = ?, updated_at = ? WHERE id = ?',
+                (status, next_attempt_at, str(error)[:1000], time.time(), email_id)
+            )
+        return status == 'pending'
+
+    def counts(self):
+        """Return {status: number of emails} for monitoring"""
+        counts = super().counts()
+        with self._connect() as conn:
+            held = conn.execute('SELECT COUNT(*) AS total FROM email_digest_items').fetchone()['total']
+        if held:
+            counts['held_for_digest'] = held
+        return counts
+
+    def purge_sent(self, older_than_seconds):
+        """Delete sent emails older than the given age"""
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM email_outbox WHERE status = 'sent' AND updated_at < ?",
+                (time.time() - older_than_seconds,)
+            )
+
+class RateLimiter:
+    """Token bucket letting threads proceed at most rate times per second on average"""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.capacity = max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until the caller may proceed"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+class EmailWorkerPool:
+    """Background threads that drain an EmailOutbox through an EmailService.
+
+    With max_per_second set, sends from all workers in the pool are limited
+    to that rate so bulk runs (reminders) stay inside the SMTP sending quota.
+    """
+
+    def __init__(self, outbox, email_service, workers=2, max_per_second=0):
+        self.outbox = outbox
+        self.email_service = email_service
+        self.workers = workers
+        self.rate_limiter = RateLimiter(max_per_second) if max_per_second > 0 else None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        """Start the worker threads"""
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"email-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Started {self.workers} email outbox workers")
+
+    def stop(self, timeout=None):
+        """Stop the worker threads after their current send"""
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def notify(self):
+        """Wake idle workers because an email was just enqueued"""
+        self._wake.set()
+
+    def _run(self):
+        last_purge = None
+        last_digest_check = None
+        while not self._stop.is_set():
+            if last_digest_check is None or time.monotonic() - last_digest_check > Config.EMAIL_POLL_SECONDS:
+                last_digest_check = time.monotonic()
+                try:
+                    if self.outbox.flush_due_digests():
+                        self._wake.set()
+                except Exception as e:
+                    logger.error(f"Failed to flush email digests: {e}")
+
+            try:
+                jobs = self.outbox.claim()
+            except Exception as e:
+                logger.error(f"Failed to read email outbox: {e}")
+                jobs = []
+
+            if not jobs:
+                if last_purge is None or time.monotonic() - last_purge > 3600:
+                    last_purge = time.monotonic()
+                    try:
+                        self.outbox.purge_sent(Config.EMAIL_OUTBOX_RETENTION_SECONDS)
+                    except Exception as e:
+                        logger.warning(f"Failed to purge sent emails: {e}")
+                self._wake.wait(Config.EMAIL_POLL_SECONDS)
+                self._wake.clear()
+                continue
+
+            for job in jobs:
+                if self.rate_limiter:
+                    self.rate_limiter.acquire()
+                self.deliver(job)
+
+    def deliver(self, job):
+        """Send one claimed email and record the outcome"""
+        error = None
+        try:
+            send = getattr(self.email_service, EMAIL_KINDS[job['kind']])
+            if send(**job['payload']):
+                self.outbox.mark_sent(job['id'])
+                return
+            error = 'send returned False'
+        except Exception as e:
+            error = e
+
+        try:
+            if self.outbox.mark_failed(job['id'], job['attempts'], error):
+                logger.warning(f"Email {job['id']} ({job['kind']}) failed on attempt {job['attempts']}, will retry: {error}")
+            else:
+                logger.error(f"Email {job['id']} ({job['kind']}) failed after {job['attempts']} attempts, giving up: {error}")
+        except Exception as e:
+            logger.error(f"Failed to record email {job['id']} failure: {e}")
+
+_outbox = None
+_workers = None
+_outbox_lock = threading.Lock()
+
+def get_email_outbox():
+    """Get the process-wide email outbox, creating it on first use"""
+    global _outbox
+    if _outbox is None:
+        with _outbox_lock:
+            if _outbox is None:
+                _outbox = EmailOutbox(Config.EMAIL_OUTBOX_PATH)
+    return _outbox
+
+def start_email_workers(email_service=None):
+    """Start this process's email worker pool if it is not already running"""
+    global _workers
+    if _workers is None:
+        outbox = get_email_outbox()
+        with _outbox_lock:
+            if _workers is None:
+                if email_service is None:
+                    from services.email_service import get_email_service
+                    email_service = get_email_service()
+                _workers = EmailWorkerPool(outbox, email_service, Config.EMAIL_WORKERS, Config.EMAIL_MAX_PER_SECOND)
+                _workers.start()
+    return _workers
+
+def enqueue_email(kind, **payload):
+    """Queue an email for background delivery; payload is the EmailService method's arguments"""
+    email_id = get_email_outbox().enqueue(kind, payload)
+    start_email_workers().notify()
+    return email_id
+
+def enqueue_emails(kind, payloads):
+    """Queue many emails of one kind for background delivery in one outbox write"""
+    if not payloads:
+        return
+    get_email_outbox().enqueue_many(kind, payloads)
+    start_email_workers().notify()
+
+def hold_for_digest(business_id, window_seconds, **payload):
+    """Hold a business notification for the business's next digest email"""
+    get_email_outbox().hold_for_digest(business_id, payload, window_seconds)
+    start_email_workers()
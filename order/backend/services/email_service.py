@@ -1,7 +1,13 @@
 import os
+import html
 import logging
-from redmail import gmail
-from datetime import datetime
+import threading
+from config import Config
+from services.email_templates import (
+    APPOINTMENT_CONFIRMATION, BUSINESS_NOTIFICATION, APPOINTMENT_REMINDER,
+    BUSINESS_DIGEST, BUSINESS_DIGEST_ROW_HTML, BUSINESS_DIGEST_ROW_TEXT, format_date, format_time
+)
+from services.smtp_pool import SMTPConnectionPool
 
 logger = logging.getLogger(__name__)
 
@@ -9,16 +15,45 @@ class EmailService:
     def __init__(self):
         self.gmail_username = os.getenv('GMAIL_USERNAME')
         self.gmail_password = os.getenv('GMAIL_PASSWORD')
+        self.smtp_pool = None
+        # A redmail sender holds a single connection, so unpooled sends must not overlap
+        self._send_lock = threading.Lock()
         
         if not self.gmail_username or not self.gmail_password:
             logger.warning("GMAIL_USERNAME or GMAIL_PASSWORD not found. Email disabled.")
             self.enabled = False
         else:
             self.enabled = True
-            # Configure Gmail
-            gmail.username = self.gmail_username
-            gmail.password = self.gmail_password
-            logger.info("Email service enabled with Gmail")
+            # redmail pulls in Jinja, so it is only imported when email is configured
+            from redmail import EmailSender
+            # Configure Gmail (SMTP_HOST/SMTP_PORT can point at a local test server instead)
+            self.sender = EmailSender(
+                host=Config.SMTP_HOST,
+                port=Config.SMTP_PORT,
+                username=self.gmail_username,
+                password=self.gmail_password,
+                use_starttls=Config.SMTP_USE_STARTTLS,
+                timeout=Config.SMTP_TIMEOUT_SECONDS
+            )
+            if Config.SMTP_POOL_SIZE > 0:
+                # Keep authenticated connections open instead of a new SMTP + TLS handshake per email
+                self.smtp_pool = SMTPConnectionPool(
+                    self.sender.get_server,
+                    size=Config.SMTP_POOL_SIZE,
+                    max_idle_seconds=Config.SMTP_MAX_IDLE_SECONDS,
+                    max_messages=Config.SMTP_MAX_MESSAGES_PER_CONNECTION
+                )
+            logger.info(f"Email service enabled with {Config.SMTP_HOST}")
+
+    def _send(self, **message):
+        """Build and send one email, over the connection pool if enabled"""
+        # Bodies come pre-rendered from services/email_templates.py, so skip redmail's Jinja pass
+        msg = self.sender.get_message(use_jinja=False, **message)
+        if self.smtp_pool:
+            self.smtp_pool.send_message(msg)
+        else:
+            with self._send_lock:
+                self.sender.send_message(msg)
 
     def send_appointment_confirmation(self, appointment_data, business_data, customer_data):
         """Send simple confirmation email to customer"""
@@ -27,59 +62,17 @@ class EmailService:
             return False
 
         try:
-            # Format date and time
-            date = datetime.strptime(appointment_data['date'], '%Y-%m-%d').strftime('%A, %B %d, %Y')
-            time = datetime.strptime(appointment_data['time'], '%H:%M').strftime('%I:%M %p')
-            
-            # Simple HTML email
-            html_content = f"""
-            <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px;">
-                <h2 style="color: #3B82F6;">Appointment Confirmed!</h2>
-                <p>Hi {customer_data['name']},</p>
-                <p>Your appointment has been successfully booked.</p>
-                
-                <div style="background-color: #f3f4f6; padding: 20px; border-radius: 8px; margin: 20px 0;">
-                    <h3>Appointment Details:</h3>
-                    <p><strong>Business:</strong> {business_data['name']}</p>
-                    <p><strong>Service:</strong> {appointment_data['service_name']}</p>
-                    <p><strong>Date:</strong> {date}</p>
-                    <p><strong>Time:</strong> {time}</p>
-                    <p><strong>Price:</strong> ${appointment_data['service_price']}</p>
-                    <p><strong>Address:</strong> {business_data['address']}</p>
-                    <p><strong>Phone:</strong> {business_data['phone']}</p>
-                </div>
-                
-                <p>Thank you for choosing {business_data['name']}!</p>
-            </div>
-            """
-            
-            # Simple text email
-            text_content = f"""
-Appointment Confirmation
-
-Hi {customer_data['name']},
-
-Your appointment has been successfully booked.
-
-APPOINTMENT DETAILS:
-Business: {business_data['name']}
-Service: {appointment_data['service_name']}
-Date: {date}
-Time: {time}
-Price: ${appointment_data['service_price']}
-Address: {business_data['address']}
-Phone: {business_data['phone']}
-
-Thank you for choosing {business_data['name']}!
-            """
+            message = APPOINTMENT_CONFIRMATION.render(
+                business_data,
+                customer_name=customer_data['name'],
+                service_name=appointment_data['service_name'],
+                date=format_date(appointment_data['date']),
+                time=format_time(appointment_data['time']),
+                price=appointment_data['service_price']
+            )
 
             # Send email
-            gmail.send(
-                subject=f"Appointment Confirmation - {business_data['name']}",
-                receivers=[customer_data['email']],
-                html=html_content,
-                text=text_content
-            )
+            self._send(receivers=[customer_data['email']], **message)
             
             logger.info(f"Confirmation email sent to {customer_data['email']}")
             return True
@@ -95,64 +88,104 @@ Thank you for choosing {business_data['name']}!
             return False
 
         try:
-            # Format date and time
-            date = datetime.strptime(appointment_data['date'], '%Y-%m-%d').strftime('%A, %B %d, %Y')
-            time = datetime.strptime(appointment_data['time'], '%H:%M').strftime('%I:%M %p')
+            message = BUSINESS_NOTIFICATION.render(
+                business_data,
+                customer_name=customer_data['name'],
+                customer_email=customer_data['email'],
+                customer_phone=customer_data.get('phone', 'Not provided'),
+                service_name=appointment_data['service_name'],
+                date=format_date(appointment_data['date']),
+                time=format_time(appointment_data['time']),
+                price=appointment_data['service_price']
+            )
+
+            # Send email
+            self._send(receivers=[business_data['email']], **message)
             
-            # Simple HTML email
-            html_content = f"""
-            <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px;">
-                <h2 style="color: #10B981;">New Appointment Received</h2>
-                <p>You have received a new appointment booking.</p>
-                
-                <div style="background-color: #f3f4f6; padding: 20px; border-radius: 8px; margin: 20px 0;">
-                    <h3>Customer Information:</h3>
-                    <p><strong>Name:</strong> {customer_data['name']}</p>
-                    <p><strong>Email:</strong> {customer_data['email']}</p>
-                    <p><strong>Phone:</strong> {customer_data.get('phone', 'Not provided')}</p>
-                    
-                    <h3>Appointment Details:</h3>
-                    <p><strong>Service:</strong> {appointment_data['service_name']}</p>
-                    <p><strong>Date:</strong> {date}</p>
-                    <p><strong>Time:</strong> {time}</p>
-                    <p><strong>Price:</strong> ${appointment_data['service_price']}</p>
-                </div>
-                
-                <p>Please log into your dashboard to manage this appointment.</p>
-            </div>
-            """
+            logger.info(f"Notification email sent to business {business_data['email']}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error sending business notification email: {e}")
+            return False
+
+    def send_appointment_reminder(self, appointment_data, business_data, customer_data):
+        """Send reminder email to customer before their appointment"""
+        if not self.enabled:
+            logger.warning("Email service disabled. Skipping email.")
+            return False
+
+        try:
+            message = APPOINTMENT_REMINDER.render(
+                business_data,
+                customer_name=customer_data['name'],
+                service_name=appointment_data['service_name'],
+                date=format_date(appointment_data['date']),
+                time=format_time(appointment_data['time'])
+            )
+
+            # Send email
+            self._send(receivers=[customer_data['email']], **message)
             
-            # Simple text email
-            text_content = f"""
-New Appointment Received
+            logger.info(f"Reminder email sent to {customer_data['email']}")
+            return True
 
-You have received a new appointment booking.
+        except Exception as e:
+            logger.error(f"Error sending reminder email: {e}")
+            return False
 
-CUSTOMER INFORMATION:
-Name: {customer_data['name']}
-Email: {customer_data['email']}
-Phone: {customer_data.get('phone', 'Not provided')}
+    def send_business_digest(self, business_data, notifications):
+        """Send one summary email to a business covering several new appointments.
 
-APPOINTMENT DETAILS:
-Service: {appointment_data['service_name']}
-Date: {date}
-Time: {time}
-Price: ${appointment_data['service_price']}
+        notifications are the held send_appointment_notification_to_business arguments.
+        """
+        if not self.enabled:
+            logger.warning("Email service disabled. Skipping email.")
+            return False
 
-Please log into your dashboard to manage this appointment.
-            """
+        try:
+            rows_html = []
+            rows_text = []
+            for notification in notifications:
+                appointment_data = notification['appointment_data']
+                customer_data = notification['customer_data']
+                row = {
+                    'date': format_date(appointment_data['date']),
+                    'time': format_time(appointment_data['time']),
+                    'service_name': appointment_data['service_name'],
+                    'price': appointment_data['service_price'],
+                    'customer_name': customer_data['name'],
+                    'customer_email': customer_data['email'],
+                    'customer_phone': customer_data.get('phone') or 'Not provided'
+                }
+                rows_html.append(BUSINESS_DIGEST_ROW_HTML.substitute({key: html.escape(str(value)) for key, value in row.items()}))
+                rows_text.append(BUSINESS_DIGEST_ROW_TEXT.substitute(row))
+
+            message = BUSINESS_DIGEST.render(
+                business_data,
+                html_fields={'rows_html': ''.join(rows_html)},
+                count=len(notifications),
+                rows_text=''.join(rows_text)
+            )
 
             # Send email
-            gmail.send(
-                subject=f"New Appointment - {customer_data['name']}",
-                receivers=[business_data['email']],
-                html=html_content,
-                text=text_content
-            )
+            self._send(receivers=[business_data['email']], **message)
             
-            logger.info(f"Notification email sent to business {business_data['email']}")
+            logger.info(f"Digest of {len(notifications)} appointments sent to business {business_data['email']}")
             return True
 
         except Exception as e:
-            logger.error(f"Error sending business notification email: {e}")
+            logger.error(f"Error sending business digest email: {e}")
             return False
+
+_email_service = None
+_email_service_lock = threading.Lock()
+
+def get_email_service():
+    """Get the process-wide EmailService, creating it on first use"""
+    global _email_service
+    if _email_service is None:
+        with _email_service_lock:
+            if _email_service is None:
+                _email_service = EmailService()
+    return _email_service
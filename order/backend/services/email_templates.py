@@ -0,0 +1,237 @@
+import html
+from functools import lru_cache
+from string import Template
+from datetime import datetime
+
+# Email layouts are parsed once at import. The fields that only depend on the
+# business (name, address, phone) are filled in once per business and the
+# result is kept, so a send only substitutes the per-appointment fields.
+
+@lru_cache(maxsize=1024)
+def format_date(date_str):
+    """Format YYYY-MM-DD as e.g. 'Monday, January 05, 2026'"""
+    return datetime.strptime(date_str, '%Y-%m-%d').strftime('%A, %B %d, %Y')
+
+@lru_cache(maxsize=256)
+def format_time(time_str):
+    """Format HH:MM as e.g. '09:30 AM'"""
+    return datetime.strptime(time_str, '%H:%M').strftime('%I:%M %p')
+
+def _literal(value):
+    # Keep '$' in substituted values from being read as a placeholder on the second pass
+    return str(value).replace('$', '$$')
+
+def _fill_business_fields(template, values):
+    """Substitute only the given placeholders, leaving others and '$$' escapes as written"""
+    def replace(match):
+        name = match.group('named') or match.group('braced')
+        return values.get(name, match.group(0))
+    return Template(template.pattern.sub(replace, template.template))
+
+class EmailTemplate:
+    """Subject, HTML and text layouts using string.Template $placeholders.
+
+    business_fields maps placeholder names to business_data keys; those are
+    substituted once per business. Values are HTML-escaped in the HTML body.
+    """
+
+    def __init__(self, subject, html_body, text_body, business_fields=None):
+        self.subject = Template(subject)
+        self.html = Template(html_body)
+        self.text = Template(text_body)
+        self.business_fields = business_fields or {}
+        self._compile_for_business = lru_cache(maxsize=1024)(self._compile_for_business)
+
+    def _compile_for_business(self, business_values):
+        values = {name: _literal(value) for name, value in business_values}
+        escaped = {name: _literal(html.escape(str(value))) for name, value in business_values}
+        return (
+            _fill_business_fields(self.subject, values),
+            _fill_business_fields(self.html, escaped),
+            _fill_business_fields(self.text, values)
+        )
+
+    def render(self, business_data, html_fields=None, **fields):
+        """Return {'subject', 'html', 'text'} for one email.
+
+        html_fields are already-escaped HTML fragments used as is in the HTML body.
+        """
+        business_values = tuple(
+            (name, business_data.get(key) or '')
+            for name, key in self.business_fields.items()
+        )
+        subject, html_body, text_body = self._compile_for_business(business_values)
+        escaped = {name: html.escape(str(value)) for name, value in fields.items()}
+        escaped.update(html_fields or {})
+        return {
+            'subject': subject.substitute(fields),
+            'html': html_body.substitute(escaped),
+            'text': text_body.substitute(fields)
+        }
+
+APPOINTMENT_CONFIRMATION = EmailTemplate(
+    subject="Appointment Confirmation - $business_name",
+    html_body="""
+            <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px;">
+                <h2 style="color: #3B82F6;">Appointment Confirmed!</h2>
+                <p>Hi $customer_name,</p>
+                <p>Your appointment has been successfully booked.</p>
+
+                <div style="background-color: #f3f4f6; padding: 20px; border-radius: 8px; margin: 20px 0;">
+                    <h3>Appointment Details:</h3>
+                    <p><strong>Business:</strong> $business_name</p>
+                    <p><strong>Service:</strong> $service_name</p>
+                    <p><strong>Date:</strong> $date</p>
+                    <p><strong>Time:</strong> $time</p>
+                    <p><strong>Price:</strong> $$$price</p>
+                    <p><strong>Address:</strong> $business_address</p>
+                    <p><strong>Phone:</strong> $business_phone</p>
+                </div>
+
+                <p>Thank you for choosing $business_name!</p>
+            </div>
+            """,
+    text_body="""
+Appointment Confirmation
+
+Hi $customer_name,
+
+Your appointment has been successfully booked.
+
+APPOINTMENT DETAILS:
+Business: $business_name
+Service: $service_name
+Date: $date
+Time: $time
+Price: $$$price
+Address: $business_address
+Phone: $business_phone
+
+Thank you for choosing $business_name!
+            """,
+    business_fields={'business_name': 'name', 'business_address': 'address', 'business_phone': 'phone'}
+)
+
+BUSINESS_NOTIFICATION = EmailTemplate(
+    subject="New Appointment - $customer_name",
+    html_body="""
+            <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px;">
+                <h2 style="color: #10B981;">New Appointment Received</h2>
+                <p>You have received a new appointment booking.</p>
+
+                <div style="background-color: #f3f4f6; padding: 20px; border-radius: 8px; margin: 20px 0;">
+                    <h3>Customer Information:</h3>
+                    <p><strong>Name:</strong> $customer_name</p>
+                    <p><strong>Email:</strong> $customer_email</p>
+                    <p><strong>Phone:</strong> $customer_phone</p>
+
+                    <h3>Appointment Details:</h3>
+                    <p><strong>Service:</strong> $service_name</p>
+                    <p><strong>Date:</strong> $date</p>
+                    <p><strong>Time:</strong> $time</p>
+                    <p><strong>Price:</strong> $$$price</p>
+                </div>
+
+                <p>Please log into your dashboard to manage this appointment.</p>
+            </div>
+            """,
+    text_body="""
+New Appointment Received
+
+You have received a new appointment booking.
+
+CUSTOMER INFORMATION:
+Name: $customer_name
+Email: $customer_email
+Phone: $customer_phone
+
+APPOINTMENT DETAILS:
+Service: $service_name
+Date: $date
+Time: $time
+Price: $$$price
+
+Please log into your dashboard to manage this appointment.
+            """
+)
+
+APPOINTMENT_REMINDER = EmailTemplate(
+    subject="Appointment Reminder - $business_name",
+    html_body="""
+            <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px;">
+                <h2 style="color: #3B82F6;">Appointment Reminder</h2>
+                <p>Hi $customer_name,</p>
+                <p>This is a reminder of your upcoming appointment.</p>
+
+                <div style="background-color: #f3f4f6; padding: 20px; border-radius: 8px; margin: 20px 0;">
+                    <h3>Appointment Details:</h3>
+                    <p><strong>Business:</strong> $business_name</p>
+                    <p><strong>Service:</strong> $service_name</p>
+                    <p><strong>Date:</strong> $date</p>
+                    <p><strong>Time:</strong> $time</p>
+                    <p><strong>Address:</strong> $business_address</p>
+                    <p><strong>Phone:</strong> $business_phone</p>
+                </div>
+
+                <p>If you can no longer make it, please contact $business_name.</p>
+            </div>
+            """,
+    text_body="""
+Appointment Reminder
+
+Hi $customer_name,
+
+This is a reminder of your upcoming appointment.
+
+APPOINTMENT DETAILS:
+Business: $business_name
+Service: $service_name
+Date: $date
+Time: $time
+Address: $business_address
+Phone: $business_phone
+
+If you can no longer make it, please contact $business_name.
+            """,
+    business_fields={'business_name': 'name', 'business_address': 'address', 'business_phone': 'phone'}
+)
+
+BUSINESS_DIGEST_ROW_HTML = Template("""
+                    <tr>
+                        <td style="padding: 8px; border-bottom: 1px solid #e5e7eb;">$date<br>$time</td>
+                        <td style="padding: 8px; border-bottom: 1px solid #e5e7eb;">$service_name<br>$$$price</td>
+                        <td style="padding: 8px; border-bottom: 1px solid #e5e7eb;">$customer_name<br>$customer_email<br>$customer_phone</td>
+                    </tr>""")
+
+BUSINESS_DIGEST_ROW_TEXT = Template("""
+- $date at $time: $service_name ($$$price)
+  $customer_name, $customer_email, $customer_phone""")
+
+BUSINESS_DIGEST = EmailTemplate(
+    subject="$count New Appointments - $business_name",
+    html_body="""
+            <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px;">
+                <h2 style="color: #10B981;">$count New Appointments Received</h2>
+                <p>These appointments were booked since your last summary.</p>
+
+                <table style="width: 100%; border-collapse: collapse; background-color: #f3f4f6; border-radius: 8px; margin: 20px 0;">
+                    <tr>
+                        <th style="padding: 8px; text-align: left;">When</th>
+                        <th style="padding: 8px; text-align: left;">Service</th>
+                        <th style="padding: 8px; text-align: left;">Customer</th>
+                    </tr>$rows_html
+                </table>
+
+                <p>Please log into your dashboard to manage these appointments.</p>
+            </div>
+            """,
+    text_body="""
+$count New Appointments Received
+
+These appointments were booked since your last summary.
+$rows_text
+
+Please log into your dashboard to manage these appointments.
+            """,
+    business_fields={'business_name': 'name'}
+)
@@ -0,0 +1,153 @@
+import json
+import queue
+import threading
+import logging
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class InMemorySubscription:
+    """Events for one listener of an InMemoryBroker channel"""
+
+    def __init__(self, broker, channel):
+        self.broker = broker
+        self.channel = channel
+        self.queue = queue.Queue(maxsize=100)
+
+    def get(self, timeout):
+        """Wait up to timeout seconds for the next event, returning None if there is none"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        """Stop receiving events"""
+        self.broker._unsubscribe(self)
+
+class InMemoryBroker:
+    """Publish/subscribe within a single process (one gunicorn worker)"""
+
+    def __init__(self):
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel):
+        """Start listening on channel"""
+        subscription = InMemorySubscription(self, channel)
+        with self._lock:
+            self._subscriptions.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def publish(self, channel, event):
+        """Deliver event to every current listener on channel"""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.queue.put_nowait(event)
+            except queue.Full:
+                # A stalled listener must not block the publisher; it will resync on reconnect
+                logger.warning(f"Dropping event for slow subscriber on {channel}")
+
+    def _unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.channel)
+            if subscriptions:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.channel]
+
+class RedisSubscription:
+    """Events for one listener of a RedisBroker channel"""
+
+    def __init__(self, pubsub):
+        self.pubsub = pubsub
+
+    def get(self, timeout):
+        """Wait up to timeout seconds for the next event, returning None if there is none"""
+        message = self.pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        if not message:
+            return None
+        return json.loads(message['data'])
+
+    def close(self):
+        """Stop receiving events"""
+        self.pubsub.close()
+
+class RedisBroker:
+    """Publish/subscribe through Redis so events reach listeners in every gunicorn worker.
+
+    Pass client to use an existing connection such as a fakeredis instance,
+    otherwise one is opened from url.
+    """
+
+    def __init__(self, url=None, client=None, channel_prefix='bookly:'):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url)
+            client.ping()
+        self.client = client
+        self.channel_prefix = channel_prefix
+
+    def subscribe(self, channel):
+        """Start listening on channel"""
+        pubsub = self.client.pubsub()
+        pubsub.subscribe(self.channel_prefix + channel)
+        return RedisSubscription(pubsub)
+
+    def publish(self, channel, event):
+        """Deliver event to every current listener on channel"""
+        self.client.publish(self.channel_prefix + channel, json.dumps(event))
+
+def create_broker():
+    """Create the event broker selected by EVENT_BROKER ('memory' or 'redis')"""
+    if Config.EVENT_BROKER == 'redis':
+        try:
+            broker = RedisBroker(url=Config.REDIS_URL)
+            logger.info("Using Redis event broker")
+            return broker
+        except Exception as e:
+            logger.error(f"Failed to connect to Redis event broker, falling back to in-process broker: {e}")
+    return InMemoryBroker()
+
+_broker = None
+_broker_lock = threading.Lock()
+
+def get_broker():
+    """Get the process-wide event broker, creating it on first use"""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = create_broker()
+    return _broker
+
+# Each open event stream holds a gunicorn thread for its whole lifetime, so
+# a process only serves SSE_MAX_STREAMS of them and keeps its other threads
+# for API requests
+_stream_slots = None
+
+def acquire_stream_slot():
+    """Reserve a stream slot in this process, returning False if all are in use"""
+    global _stream_slots
+    if _stream_slots is None:
+        with _broker_lock:
+            if _stream_slots is None:
+                _stream_slots = threading.BoundedSemaphore(Config.SSE_MAX_STREAMS)
+    return _stream_slots.acquire(blocking=False)
+
+def release_stream_slot():
+    """Give back a slot taken with acquire_stream_slot"""
+    _stream_slots.release()
+
+def business_channel(business_id):
+    """Channel carrying the events for one business"""
+    return f"business:{business_id}"
+
+def publish_business_event(business_id, event_type, data):
+    """Publish an event to a business's listeners, never failing the caller"""
+    try:
+        get_broker().publish(business_channel(business_id), {'type': event_type, 'data': data})
+    except Exception as e:
+        logger.error(f"Failed to publish {event_type} event for business {business_id}: {e}")
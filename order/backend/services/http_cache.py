@@ -0,0 +1,78 @@
+import time
+import hashlib
+import logging
+from datetime import datetime, timezone
+from flask import request, Response
+from config import Config
+from services.cache import RedisCache, get_cache, cache_get, cache_set
+
+logger = logging.getLogger(__name__)
+
+# Every business has a version (microsecond timestamp) kept in the shared
+# cache backend. Write routes bump it, and read routes derive a strong ETag
+# from it plus the request URL, so revalidating an unchanged resource is a
+# 304 without building the response body.
+#
+# With the per-process memory cache a write handled by one gunicorn worker
+# does not bump the version the other workers hold, so there versions expire
+# after ETAG_VERSION_TTL seconds, which bounds how long those workers can
+# answer 304 for stale data. Redis shares versions, so they never expire.
+
+def _version_key(business_id):
+    return f"business_version:{business_id}"
+
+def _version_ttl():
+    return None if isinstance(get_cache(), RedisCache) else Config.ETAG_VERSION_TTL
+
+def get_business_version(business_id):
+    """Get the current version of a business, starting one if none is known"""
+    version = cache_get(_version_key(business_id))
+    if version is None:
+        # Unknown (first use or evicted): start from now so no old ETag can match
+        version = time.time_ns() // 1000
+        cache_set(_version_key(business_id), version, _version_ttl())
+    return version
+
+def bump_business_version(business_id):
+    """Mark every cached representation of a business as stale"""
+    current = cache_get(_version_key(business_id)) or 0
+    # Move to a later whole second than the current version so the
+    # second-precision Last-Modified header changes on every bump too
+    next_second = (current // 1_000_000 + 1) * 1_000_000
+    cache_set(_version_key(business_id), max(time.time_ns() // 1000, next_second), _version_ttl())
+
+def business_validators(business_id, *extra):
+    """Return (etag, last_modified) for the current request on a business resource.
+
+    extra lets a route mix in anything else its body depends on, such as
+    the current time slot for availability. Those bodies can change without a
+    write, so they get no Last-Modified (last_modified is None).
+    """
+    version = get_business_version(business_id)
+    tag_source = ':'.join([str(version), request.full_path] + [str(part) for part in extra])
+    etag = hashlib.sha1(tag_source.encode('utf-8')).hexdigest()
+    last_modified = None
+    if not extra:
+        last_modified = datetime.fromtimestamp(version / 1_000_000, tz=timezone.utc)
+    return etag, last_modified
+
+def not_modified(etag, last_modified):
+    """Return a 304 response if the client's cached copy is current, otherwise None"""
+    if request.if_none_match:
+        is_current = request.if_none_match.contains(etag)
+    elif request.if_modified_since and last_modified:
+        is_current = last_modified.replace(microsecond=0) <= request.if_modified_since
+    else:
+        is_current = False
+
+    if not is_current:
+        return None
+    return add_validators(Response(status=304), etag, last_modified)
+
+def add_validators(response, etag, last_modified):
+    """Attach ETag/Last-Modified and ask clients to revalidate before reuse"""
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
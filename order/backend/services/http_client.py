@@ -0,0 +1,71 @@
+import os
+import threading
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# One keep-alive HTTP session per process for the direct Supabase REST and
+# storage calls (QR code uploads, downloads and bucket setup), so repeated
+# calls reuse open TCP+TLS connections instead of connecting every time.
+#
+# Every request gets HTTP_CONNECT_TIMEOUT_SECONDS / HTTP_READ_TIMEOUT_SECONDS
+# unless it passes its own timeout. Connection errors and 429/5xx responses
+# are retried HTTP_RETRIES times with exponential backoff; all of these
+# calls are upserts, lookups or deletes, so retrying POST/PATCH is safe.
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+RETRY_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'POST', 'PUT', 'PATCH', 'DELETE'])
+
+class TimeoutSession(requests.Session):
+    """requests.Session applying a default timeout to every request"""
+
+    def __init__(self, timeout):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return super().request(method, url, **kwargs)
+
+def create_http_session(pool_maxsize=None):
+    """Create a session with the configured timeouts, retries and connection pool.
+
+    pool_maxsize is the number of connections kept open per host (defaults to
+    HTTP_POOL_MAXSIZE); size it to the number of threads using the session.
+    """
+    session = TimeoutSession((Config.HTTP_CONNECT_TIMEOUT_SECONDS, Config.HTTP_READ_TIMEOUT_SECONDS))
+    retry = Retry(
+        total=Config.HTTP_RETRIES,
+        backoff_factor=Config.HTTP_RETRY_BACKOFF_SECONDS,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=RETRY_METHODS,
+        # Hand the last response back instead of raising so callers keep their status checks
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=Config.HTTP_POOL_CONNECTIONS,
+        pool_maxsize=pool_maxsize or Config.HTTP_POOL_MAXSIZE,
+        max_retries=retry
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+def get_http_session():
+    """Get this process's shared HTTP session, creating it on first use"""
+    global _session, _session_pid
+    # A session inherited across fork would share sockets with the parent
+    if _session is None or _session_pid != os.getpid():
+        with _session_lock:
+            if _session is None or _session_pid != os.getpid():
+                _session = create_http_session()
+                _session_pid = os.getpid()
+    return _session
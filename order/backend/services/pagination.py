@@ -0,0 +1,71 @@
+import json
+import base64
+import binascii
+from flask import request
+from config import Config
+
+# Keyset pagination for list endpoints. Pages are ordered by a fixed list of
+# sort columns ending in a unique one (id), and the cursor holds the sort
+# values of the last row returned. The next page then continues strictly
+# after that row, so it costs an index range scan no matter how deep it is
+# and rows inserted between requests never shift or repeat a page.
+
+def encode_page_cursor(values):
+    """Encode the sort values of a row as an opaque, URL-safe page cursor"""
+    return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii')
+
+def decode_page_cursor(cursor, sort_columns):
+    """Decode a page cursor back to its sort values, raising ValueError if malformed"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+    except (binascii.Error, UnicodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if not isinstance(values, list) or len(values) != len(sort_columns):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return values
+
+def get_page_args():
+    """Read (limit, after) from the query string, raising ValueError for a bad limit"""
+    limit = request.args.get('limit', Config.DEFAULT_PAGE_SIZE)
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid limit: {limit}") from e
+    if limit < 1:
+        raise ValueError(f"Invalid limit: {limit}")
+    return min(limit, Config.MAX_PAGE_SIZE), request.args.get('after') or None
+
+def _quote(value):
+    # PostgREST filter values are double quoted so ':', ',' and '.' in dates/times are literal
+    return '"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+def paginate(query, sort_columns, limit, after=None):
+    """Order query by sort_columns and limit it to the page after the given cursor.
+
+    One extra row is fetched so page_response can tell whether there is a
+    next page. Raises ValueError if after is not a cursor for sort_columns.
+    """
+    if after:
+        values = decode_page_cursor(after, sort_columns)
+        # (a, b, id) > (va, vb, vid) expanded to a > va OR (a = va AND b > vb) OR ...
+        conditions = []
+        for index, column in enumerate(sort_columns):
+            terms = [f"{sort_columns[i]}.eq.{_quote(values[i])}" for i in range(index)]
+            terms.append(f"{column}.gt.{_quote(values[index])}")
+            conditions.append(f"and({','.join(terms)})")
+        # postgrest-py 0.13 (pinned by supabase 2.0) has no or_(), so the
+        # or=(...) filter is added as a raw query parameter
+        query.params = query.params.add('or', f"({','.join(conditions)})")
+
+    # One order=a,b,id parameter: calling order() per column sends repeated
+    # order parameters, of which PostgREST only applies one
+    query.params = query.params.add('order', ','.join(sort_columns))
+    return query.limit(limit + 1)
+
+def page_response(rows, sort_columns, limit):
+    """Build the {'data': [...], 'next_cursor': ...} body for a page fetched with paginate"""
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_page_cursor([rows[-1][column] for column in sort_columns])
+    return {'data': rows, 'next_cursor': next_cursor}
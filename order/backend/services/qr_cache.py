@@ -0,0 +1,169 @@
+import os
+import re
+import glob
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Local copies of the QR code SVGs kept in Supabase storage (and of PNGs
+# rendered locally), so serving a business's QR image does not download it
+# on every dashboard load.
+#
+# Files live in QR_CACHE_DIR as <business_id>/<target hash>.<variant>, where
+# the target is the booking URL the QR code encodes and variant is 'svg' or
+# '<size>.png'. Lookups are made with the business's current target, so a
+# new slug or FRONTEND_URL never finds an image of the old one, and storing
+# an image for a new target removes the old target's files. Files older than
+# QR_CACHE_TTL count as missing, which bounds how long a copy can differ from
+# storage (e.g. after regenerate_qr_codes.py ran on another host).
+#
+# The most recently used images are also kept in memory together with an
+# ETag derived from their content. A memory entry is only used while its
+# file still has the same mtime and size, since another worker may replace it.
+
+# Business ids are UUIDs; anything else never touches the disk
+SAFE_ID = re.compile(r'^[A-Za-z0-9-]+$')
+
+def target_hash(target):
+    """Short stable hash of a QR code's target URL used in cache file names"""
+    return hashlib.sha1(str(target).encode('utf-8')).hexdigest()[:16]
+
+def content_etag(content):
+    """ETag for QR image bytes"""
+    return hashlib.sha1(content).hexdigest()
+
+def file_signature(path):
+    """(mtime, size) of a file, or None if it is gone"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+class QRImageCache:
+    """Memory LRU in front of an on-disk directory of QR code images"""
+
+    def __init__(self, directory, max_entries=256, max_age=3600):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _business_directory(self, business_id):
+        # One directory per business keeps lookups independent of how many businesses are cached
+        return os.path.join(self.directory, business_id)
+
+    def _path(self, business_id, target, variant):
+        return os.path.join(self._business_directory(business_id), f"{target_hash(target)}.{variant}")
+
+    def _is_fresh(self, signature):
+        return signature is not None and time.time() - signature[0] / 1e9 < self.max_age
+
+    def _business_files(self, business_id, variant='*'):
+        return glob.glob(os.path.join(self._business_directory(business_id), f"*.{variant}"))
+
+    def _remember(self, key, path, content, signature=None):
+        entry = (path, signature or file_signature(path), content, content_etag(content))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def get(self, business_id, target, variant='svg'):
+        """Return (content, etag) for a business's cached image of target, or None if missing or expired"""
+        if not SAFE_ID.match(str(business_id)):
+            return None
+
+        key = (business_id, variant)
+        path = self._path(business_id, target, variant)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                self._entries.move_to_end(key)
+
+        # Another worker may have replaced or removed the file since
+        if entry and entry[0] == path and entry[1] == file_signature(path) and self._is_fresh(entry[1]):
+            return entry[2], entry[3]
+
+        try:
+            with open(path, 'rb') as f:
+                # Stat the open file so the signature matches the content read
+                stat = os.fstat(f.fileno())
+                content = f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Could not read cached QR code {path}: {e}")
+            return None
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if not self._is_fresh(signature):
+            return None
+        _, _, content, etag = self._remember(key, path, content, signature)
+        return content, etag
+
+    def put(self, business_id, target, content, variant='svg'):
+        """Store an image encoding target for a business; returns the ETag.
+
+        Images of any other target (an old slug or FRONTEND_URL) are removed.
+        """
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        path = self._path(business_id, target, variant)
+        # Files kept next to the new one: the other variants of this target
+        current_prefix = self._path(business_id, target, '')
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if key[0] == business_id and not entry[0].startswith(current_prefix)]:
+                del self._entries[key]
+        if not SAFE_ID.match(str(business_id)):
+            return content_etag(content)
+
+        try:
+            os.makedirs(self._business_directory(business_id), exist_ok=True)
+            # Write then rename so readers never see a partial file
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+            for old_path in self._business_files(business_id):
+                if not old_path.startswith(current_prefix):
+                    os.remove(old_path)
+        except OSError as e:
+            logger.warning(f"Could not write QR code cache for business {business_id}: {e}")
+        return self._remember((business_id, variant), path, content)[3]
+
+    def discard(self, business_id):
+        """Forget every cached image for a business"""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == business_id]:
+                del self._entries[key]
+        if not SAFE_ID.match(str(business_id)):
+            return
+        for path in self._business_files(business_id):
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.warning(f"Could not remove cached QR code {path}: {e}")
+        try:
+            os.rmdir(self._business_directory(business_id))
+        except OSError:
+            pass
+
+_qr_cache = None
+_qr_cache_lock = threading.Lock()
+
+def get_qr_cache():
+    """Return the process-wide QR image cache"""
+    global _qr_cache
+    if _qr_cache is None:
+        with _qr_cache_lock:
+            if _qr_cache is None:
+                _qr_cache = QRImageCache(Config.QR_CACHE_DIR, Config.QR_CACHE_MAX_ENTRIES, Config.QR_CACHE_TTL)
+    return _qr_cache
@@ -0,0 +1,187 @@
+import time
+import threading
+import logging
+from config import Config
+from services.sqlite_queue import SQLiteQueue, retry_schedule
+
+logger = logging.getLogger(__name__)
+
+# Background QR code generation. Registration and slug changes only record a
+# job in a local SQLite file; a worker thread renders and uploads the QR code
+# and retries failures with exponential backoff, like the email outbox.
+#
+# Jobs are keyed by business id, so queueing the same business again while a
+# job is pending just updates its slug and name instead of adding a second
+# job. A job whose slug changes while it runs is picked up again with the new
+# slug rather than being marked done.
+
+class QRJobQueue(SQLiteQueue):
+    """SQLite-backed queue of QR codes waiting to be generated"""
+
+    table = 'qr_jobs'
+    key_column = 'job_key'
+
+    def create_tables(self, conn):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS qr_jobs (
+                job_key TEXT PRIMARY KEY,
+                business_id TEXT NOT NULL,
+                slug TEXT NOT NULL,
+                name TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                claimed_at REAL,
+                last_error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_qr_jobs_due ON qr_jobs(status, next_attempt_at)')
+
+    def enqueue(self, business_id, slug, name):
+        """Queue QR generation for a business, replacing any job not yet finished; returns the job key"""
+        job_key = f"qr:{business_id}"
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                """INSERT INTO qr_jobs (job_key, business_id, slug, name, next_attempt_at, created_at, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(job_key) DO UPDATE SET
+                       slug = excluded.slug, name = excluded.name, status = 'pending', attempts = 0,
+                       next_attempt_at = excluded.next_attempt_at, last_error = NULL, updated_at = excluded.updated_at
+                   WHERE qr_jobs.status IN ('done', 'failed') OR qr_jobs.slug != excluded.slug OR qr_jobs.name != excluded.name""",
+                (job_key, business_id, slug, name, now, now, now)
+            )
+        return job_key
+
+    def claim(self):
+        """Mark the next due job as running and return it as a dict, or None.
+
+        Jobs left running longer than QR_JOB_CLAIM_TIMEOUT_SECONDS (the worker
+        died) are claimable again.
+        """
+        jobs = self._claim_rows(1, Config.QR_JOB_CLAIM_TIMEOUT_SECONDS)
+        return jobs[0] if jobs else None
+
+    def mark_done(self, job):
+        """Record a finished job, unless it was queued again with a new slug while running"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE qr_jobs SET status = 'done', last_error = NULL, updated_at = ? WHERE job_key = ? AND status = 'running' AND slug = ?",
+                (time.time(), job['job_key'], job['slug'])
+            )
+
+    def mark_failed(self, job, error):
+        """Schedule a retry with exponential backoff, or give up after QR_JOB_MAX_ATTEMPTS.
+
+        Returns True if the job will be retried.
+        """
+        status, next_attempt_at = retry_schedule(
+            job['attempts'], Config.QR_JOB_MAX_ATTEMPTS, Config.QR_JOB_RETRY_BASE_SECONDS, Config.QR_JOB_RETRY_MAX_SECONDS
+        )
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE qr_jobs SET status = ?, next_attempt_at = ?, last_error = ?, updated_at = ? WHERE job_key = ? AND status = 'running' AND slug = ?",
+                (status, next_attempt_at, str(error)[:1000], time.time(), job['job_key'], job['slug'])
+            )
+        return status == 'pending'
+
+class QRJobWorker:
+    """Background thread generating queued QR codes through a QRCodeService"""
+
+    def __init__(self, queue, qr_service):
+        self.queue = queue
+        self.qr_service = qr_service
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the worker thread"""
+        self._thread = threading.Thread(target=self._run, name='qr-worker', daemon=True)
+        self._thread.start()
+        logger.info("Started QR code worker")
+
+    def stop(self, timeout=None):
+        """Stop the worker after its current job"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def notify(self):
+        """Wake the worker because a job was just queued"""
+        self._wake.set()
+
+    def _run(self):
+        # Storage setup happens once here instead of before every upload
+        try:
+            self.qr_service.ensure_bucket()
+        except Exception as e:
+            logger.error(f"Failed to check QR code bucket: {e}")
+
+        while not self._stop.is_set():
+            try:
+                job = self.queue.claim()
+            except Exception as e:
+                logger.error(f"Failed to read QR job queue: {e}")
+                job = None
+
+            if not job:
+                self._wake.wait(Config.QR_JOB_POLL_SECONDS)
+                self._wake.clear()
+                continue
+
+            self.run_job(job)
+
+    def run_job(self, job):
+        """Generate one claimed QR code and record the outcome"""
+        try:
+            self.qr_service.publish_business_qr_code(job['business_id'], job['slug'])
+            self.queue.mark_done(job)
+            logger.info(f"QR code generated for business: {job['business_id']}")
+            return
+        except Exception as e:
+            error = e
+
+        try:
+            if self.queue.mark_failed(job, error):
+                logger.warning(f"QR code for business {job['business_id']} failed on attempt {job['attempts']}, will retry: {error}")
+            else:
+                logger.error(f"QR code for business {job['business_id']} failed after {job['attempts']} attempts, giving up: {error}")
+        except Exception as e:
+            logger.error(f"Failed to record QR job {job['job_key']} failure: {e}")
+
+_queue = None
+_worker = None
+_queue_lock = threading.Lock()
+
+def get_qr_job_queue():
+    """Get the process-wide QR job queue, creating it on first use"""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = QRJobQueue(Config.QR_JOBS_PATH)
+    return _queue
+
+def start_qr_worker(qr_service=None):
+    """Start this process's QR worker if it is not already running"""
+    global _worker
+    if _worker is None:
+        queue = get_qr_job_queue()
+        with _queue_lock:
+            if _worker is None:
+                if qr_service is None:
+                    from services.qr_service import QRCodeService
+                    qr_service = QRCodeService()
+                _worker = QRJobWorker(queue, qr_service)
+                _worker.start()
+    return _worker
+
+def enqueue_qr_code(business_id, slug, name):
+    """Queue QR code generation for a business; returns the job key"""
+    job_key = get_qr_job_queue().enqueue(business_id, slug, name)
+    start_qr_worker().notify()
+    return job_key
@@ -0,0 +1,81 @@
+import zlib
+import struct
+from qrcodegen import QrCode
+
+# Renderers for qrcodegen QrCode objects.
+#
+# The SVG is a single <path> made of one rectangle per horizontal run of dark
+# modules, in module units, instead of one <rect> per module. The PNG is a
+# 1-bit grayscale image built with zlib, so no imaging library is needed.
+
+def dark_runs(qr_code, y):
+    """Yield (x, length) for each horizontal run of dark modules in row y"""
+    size = qr_code.get_size()
+    x = 0
+    while x < size:
+        if qr_code.get_module(x, y):
+            start = x
+            while x < size and qr_code.get_module(x, y):
+                x += 1
+            yield start, x - start
+        else:
+            x += 1
+
+def qr_code_to_svg(qr_code, border=0):
+    """Render a QR code as an SVG string with a single path"""
+    size = qr_code.get_size()
+    dimension = size + border * 2
+    path = ''.join(
+        f"M{x + border} {y + border}h{length}v1h-{length}z"
+        for y in range(size)
+        for x, length in dark_runs(qr_code, y)
+    )
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" version="1.1" viewBox="0 0 {dimension} {dimension}" '
+        f'stroke="none" shape-rendering="crispEdges">'
+        f'<rect width="{dimension}" height="{dimension}" fill="white"/>'
+        f'<path d="{path}" fill="black"/>'
+        '</svg>'
+    )
+
+def render_url_svg(url):
+    """Encode url and render it as an SVG string (picklable, for process pools)"""
+    return qr_code_to_svg(QrCode.encode_text(url, QrCode.Ecc.MEDIUM))
+
+def _png_chunk(kind, data):
+    chunk = kind + data
+    return struct.pack('>I', len(data)) + chunk + struct.pack('>I', zlib.crc32(chunk) & 0xffffffff)
+
+def qr_code_to_png(qr_code, size=256):
+    """Render a QR code as a size x size PNG (bytes).
+
+    Modules are scaled by the largest whole factor that fits and centered on
+    a white background, so the image is never smaller than the code itself.
+    """
+    modules = qr_code.get_size()
+    size = max(size, modules)
+    scale = size // modules
+    margin = (size - modules * scale) // 2
+    # Pad rows to whole bytes; bit 1 is white, 0 is black
+    padded_width = -(-size // 8) * 8
+
+    def pack(bits):
+        return b'\x00' + int(''.join(bits), 2).to_bytes(padded_width // 8, 'big')
+
+    blank_row = pack(['1'] * padded_width)
+    rows = [blank_row] * margin
+    for module_y in range(modules):
+        bits = ['1'] * padded_width
+        for x, length in dark_runs(qr_code, module_y):
+            start = margin + x * scale
+            bits[start:start + length * scale] = '0' * (length * scale)
+        rows.extend([pack(bits)] * scale)
+    rows.extend([blank_row] * (size - len(rows)))
+
+    header = struct.pack('>IIBBBBB', size, size, 1, 0, 0, 0, 0)
+    return b''.join([
+        b'\x89PNG\r\n\x1a\n',
+        _png_chunk(b'IHDR', header),
+        _png_chunk(b'IDAT', zlib.compress(b''.join(rows), 9)),
+        _png_chunk(b'IEND', b'')
+    ])
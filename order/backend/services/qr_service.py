@@ -1,41 +1,44 @@
 import os
 import logging
-import requests
+import threading
 from qrcodegen import QrCode
 from config import Config
+from services.qr_cache import get_qr_cache
+from services.qr_render import qr_code_to_svg
+from services.http_client import get_http_session
 
 logger = logging.getLogger(__name__)
 
+def business_booking_url(business_slug):
+    """URL of a business's booking page, which its QR code points at"""
+    base_url = os.getenv('FRONTEND_URL', 'http://localhost:5173')
+    return f"{base_url}/{business_slug}"
+
 class QRCodeService:
     def __init__(self):
         try:
             self.bucket_name = 'business-qr-codes'
             self.enabled = True
+            self._bucket_ready = False
+            self._bucket_lock = threading.Lock()
             # Validate configuration
             Config.validate_supabase_config()
         except Exception as e:
             logger.error(f"Failed to initialize QR code service: {e}")
             self.enabled = False
 
-    def _qr_code_to_svg(self, qr_code, scale=4):
-        """Convert QR code to SVG string"""
-        size = qr_code.get_size()
-        svg_size = size * scale
-
-        svg_parts = [
-            f'<svg xmlns="http://www.w3.org/2000/svg" version="1.1" viewBox="0 0 {svg_size} {svg_size}" stroke="none">',
-            f'<rect width="{svg_size}" height="{svg_size}" fill="white"/>'
-        ]
-
-        for y in range(size):
-            for x in range(size):
-                if qr_code.get_module(x, y):
-                    svg_parts.append(
-                        f'<rect x="{x * scale}" y="{y * scale}" width="{scale}" height="{scale}" fill="black"/>'
-                    )
+    def build_qr_code(self, business_slug):
+        """Encode the booking page URL for a business slug"""
+        return QrCode.encode_text(business_booking_url(business_slug), QrCode.Ecc.MEDIUM)
 
-        svg_parts.append('</svg>')
-        return ''.join(svg_parts)
+    def ensure_bucket(self):
+        """Make sure the storage bucket exists, checking Supabase only until it succeeds once"""
+        if self._bucket_ready:
+            return True
+        with self._bucket_lock:
+            if not self._bucket_ready:
+                self._bucket_ready = self._ensure_bucket_exists()
+        return self._bucket_ready
 
     def _ensure_bucket_exists(self):
         """Ensure the bucket exists, create if it doesn't"""
@@ -47,7 +50,7 @@ class QRCodeService:
                 'apikey': Config.SUPABASE_SERVICE_KEY
             }
             
-            response = requests.get(url, headers=headers)
+            response = get_http_session().get(url, headers=headers)
             if response.status_code == 200:
                 buckets = response.json()
                 bucket_names = [bucket.get('name', '') for bucket in buckets]
@@ -64,7 +67,7 @@ class QRCodeService:
                 'public': True  # Make bucket public so QR codes are accessible
             }
             
-            create_response = requests.post(create_url, headers=headers, json=create_data)
+            create_response = get_http_session().post(create_url, headers=headers, json=create_data)
             if create_response.status_code == 200:
                 logger.info(f"Created public bucket: {self.bucket_name}")
                 return True
@@ -76,111 +79,95 @@ class QRCodeService:
             logger.error(f"Error in bucket handling: {e}")
             return False
 
-    def generate_business_qr_code(self, business_id, business_slug, business_name):
-        """Generate QR code for a business and upload to Supabase storage"""
+    def upload_business_qr_code(self, business_id, business_slug, svg_content, session=None):
+        """Upload a rendered QR SVG to storage (replacing any existing one) and cache it locally.
+
+        Raises RuntimeError if storage rejects the upload. session overrides
+        the shared HTTP session (e.g. one sized for many parallel uploads).
+        """
+        http = session or get_http_session()
+        filename = f"{business_id}.svg"
+        upload_url = f"{Config.SUPABASE_URL}/storage/v1/object/{self.bucket_name}/{filename}"
+        
+        headers = {
+            'Authorization': f'Bearer {Config.SUPABASE_SERVICE_KEY}',
+            'apikey': Config.SUPABASE_SERVICE_KEY,
+            'Content-Type': 'image/svg+xml'
+        }
+        
+        # Convert SVG content to bytes
+        svg_bytes = svg_content.encode('utf-8') if isinstance(svg_content, str) else svg_content
+        
+        # Upload with upsert option
+        response = http.post(upload_url, headers=headers, data=svg_bytes, params={'upsert': True})
+        if response.status_code != 200:
+            raise RuntimeError(f"Failed to upload QR code: HTTP {response.status_code}: {response.text}")
+        
+        # Keep a local copy so serving the image needs no download
+        get_qr_cache().put(business_id, business_booking_url(business_slug), svg_bytes)
+        return filename
+
+    def publish_business_qr_code(self, business_id, business_slug):
+        """Render, upload and record a business's QR code, raising on any failure"""
         if not self.enabled:
-            logger.error("QR code service not available")
-            return None
+            raise RuntimeError("QR code service not available")
 
-        try:
-            # Try to ensure bucket exists
-            self._ensure_bucket_exists()
+        # Try to ensure bucket exists (a no-op after the first success)
+        self.ensure_bucket()
 
-            # Create the URL that the QR code will point to
-            base_url = os.getenv('FRONTEND_URL', 'http://localhost:5173')
-            booking_url = f"{base_url}/{business_slug}"
+        # Generate QR code pointing at the booking page
+        svg_content = qr_code_to_svg(self.build_qr_code(business_slug))
 
-            # Generate QR code
-            qr_code = QrCode.encode_text(booking_url, QrCode.Ecc.MEDIUM)
+        filename = self.upload_business_qr_code(business_id, business_slug, svg_content)
 
-            # Convert to SVG string
-            svg_content = self._qr_code_to_svg(qr_code, scale=4)
-
-            # Create filename
-            filename = f"{business_id}.svg"
+        # Update the business record with the QR code filename
+        self.update_business_qr_code_name(business_id, filename)
 
-            # Upload to Supabase storage using REST API
-            try:
-                upload_url = f"{Config.SUPABASE_URL}/storage/v1/object/{self.bucket_name}/{filename}"
-                
-                headers = {
-                    'Authorization': f'Bearer {Config.SUPABASE_SERVICE_KEY}',
-                    'apikey': Config.SUPABASE_SERVICE_KEY,
-                    'Content-Type': 'image/svg+xml'
-                }
-                
-                # Convert SVG content to bytes
-                svg_bytes = svg_content.encode('utf-8')
-                
-                # Upload with upsert option
-                upload_data = {
-                    'upsert': True
-                }
-                
-                response = requests.post(
-                    upload_url, 
-                    headers=headers, 
-                    data=svg_bytes,
-                    params=upload_data
-                )
-
-                if response.status_code == 200:
-                    # Update the business record with the QR code filename
-                    self._update_business_qr_code_name(business_id, filename)
-                    
-                    # Get the download URL (not public URL)
-                    download_url = self.get_business_qr_code_download_url(business_id)
-                    logger.info(f"QR code uploaded successfully: {download_url}")
-                    return download_url
-                else:
-                    logger.error(f"Failed to upload QR code: HTTP {response.status_code}")
-                    logger.error(f"Response: {response.text}")
-                    return None
-
-            except Exception as upload_error:
-                logger.error(f"Error uploading QR code to storage: {upload_error}")
-                # Try to get existing URL if upload failed
-                try:
-                    existing_url = self.get_business_qr_code_download_url(business_id)
-                    if existing_url:
-                        logger.info(f"Using existing QR code: {existing_url}")
-                        return existing_url
-                except:
-                    pass
-                return None
+        # Get the download URL (not public URL)
+        download_url = self.get_business_qr_code_download_url(business_id)
+        logger.info(f"QR code uploaded successfully: {download_url}")
+        return download_url
 
-        except Exception as e:
-            logger.error(f"Error generating QR code: {e}")
+    def generate_business_qr_code(self, business_id, business_slug, business_name):
+        """Generate QR code for a business and upload to Supabase storage"""
+        if not self.enabled:
+            logger.error("QR code service not available")
             return None
 
-    def _update_business_qr_code_name(self, business_id, filename):
-        """Update the business record with the QR code filename"""
         try:
-            update_url = f"{Config.SUPABASE_URL}/rest/v1/businesses?id=eq.{business_id}"
-            
-            headers = {
-                'Authorization': f'Bearer {Config.SUPABASE_SERVICE_KEY}',
-                'apikey': Config.SUPABASE_SERVICE_KEY,
-                'Content-Type': 'application/json',
-                'Prefer': 'return=representation'
-            }
-            
-            update_data = {
-                'qr_code_name': filename  # Store the actual filename
-            }
-            
-            response = requests.patch(update_url, headers=headers, json=update_data)
-            
-            if response.status_code == 200:
-                logger.info(f"Updated business {business_id} with QR code filename: {filename}")
-                return True
-            else:
-                logger.warning(f"Could not update business QR code name: {response.text}")
-                return False
-                
-        except Exception as e:
-            logger.error(f"Error updating business QR code name: {e}")
-            return False
+            return self.publish_business_qr_code(business_id, business_slug)
+        except Exception as upload_error:
+            logger.error(f"Error generating QR code: {upload_error}")
+            # Try to get existing URL if upload failed
+            try:
+                existing_url = self.get_business_qr_code_download_url(business_id)
+                if existing_url:
+                    logger.info(f"Using existing QR code: {existing_url}")
+                    return existing_url
+            except:
+                pass
+            return None
+
+    def update_business_qr_code_name(self, business_id, filename, session=None):
+        """Update the business record with the QR code filename, raising RuntimeError on failure"""
+        http = session or get_http_session()
+        update_url = f"{Config.SUPABASE_URL}/rest/v1/businesses?id=eq.{business_id}"
+        
+        headers = {
+            'Authorization': f'Bearer {Config.SUPABASE_SERVICE_KEY}',
+            'apikey': Config.SUPABASE_SERVICE_KEY,
+            'Content-Type': 'application/json',
+            'Prefer': 'return=representation'
+        }
+        
+        update_data = {
+            'qr_code_name': filename  # Store the actual filename
+        }
+        
+        response = http.patch(update_url, headers=headers, json=update_data)
+        if response.status_code != 200:
+            raise RuntimeError(f"Failed to update business QR code name: HTTP {response.status_code}: {response.text}")
+        logger.info(f"Updated business {business_id} with QR code filename: {filename}")
 
     def get_business_qr_code_download_url(self, business_id):
         """Get the download URL for a business's QR code using proper Supabase storage method"""
@@ -216,6 +203,8 @@ class QRCodeService:
         if not self.enabled:
             return False
 
+        get_qr_cache().discard(business_id)
+
         try:
             filename = f"{business_id}.svg"
             delete_url = f"{Config.SUPABASE_URL}/storage/v1/object/{self.bucket_name}/{filename}"
@@ -225,7 +214,7 @@ class QRCodeService:
                 'apikey': Config.SUPABASE_SERVICE_KEY
             }
             
-            response = requests.delete(delete_url, headers=headers)
+            response = get_http_session().delete(delete_url, headers=headers)
             
             if response.status_code == 200:
                 logger.info(f"QR code deleted: {filename}")
@@ -0,0 +1,136 @@
+import threading
+import logging
+from datetime import datetime, timedelta, timezone
+from config import Config
+from services.email_outbox import enqueue_emails
+from services.pagination import paginate, page_response
+
+logger = logging.getLogger(__name__)
+
+# Reminder emails for appointments starting within REMINDER_LEAD_HOURS.
+# Each run reads the whole window with one paged range query, claims the
+# appointments per business by setting reminder_sent_at only where it is
+# still null (see migrations/add_appointment_reminders.sql), and queues one
+# email per claimed appointment in the outbox. Only rows this run actually
+# claimed are emailed, so overlapping or repeated runs never double-send.
+
+REMINDER_COLUMNS = (
+    'id, business_id, appointment_date, appointment_time, status, '
+    'customers(name, email), services(name), businesses(name, address, phone)'
+)
+REMINDER_SORT_COLUMNS = ['appointment_date', 'appointment_time', 'id']
+
+# Ids per claim update, keeping the in.(...) filter well inside URL limits
+CLAIM_CHUNK_SIZE = 200
+
+def fetch_upcoming_appointments(supabase, start, end):
+    """Get appointments without a reminder that start after start and no later than end"""
+    appointments = []
+    after = None
+    while True:
+        query = supabase.table('appointments').select(REMINDER_COLUMNS).gte('appointment_date', start.strftime('%Y-%m-%d')).lte('appointment_date', end.strftime('%Y-%m-%d')).is_('reminder_sent_at', 'null')
+        result = paginate(query, REMINDER_SORT_COLUMNS, Config.REMINDER_BATCH_SIZE, after).execute()
+        page = page_response(result.data, REMINDER_SORT_COLUMNS, Config.REMINDER_BATCH_SIZE)
+        appointments.extend(page['data'])
+        after = page['next_cursor']
+        if not after:
+            break
+
+    upcoming = []
+    for apt in appointments:
+        if apt.get('status') == 'cancelled':
+            continue
+        starts_at = datetime.strptime(f"{apt['appointment_date']} {apt['appointment_time'][:5]}", '%Y-%m-%d %H:%M')
+        if start < starts_at <= end:
+            upcoming.append(apt)
+    return upcoming
+
+def group_by_business(appointments):
+    """Group appointment rows into {business_id: [rows]}"""
+    groups = {}
+    for apt in appointments:
+        groups.setdefault(apt['business_id'], []).append(apt)
+    return groups
+
+def claim_reminders(supabase, appointment_ids):
+    """Mark appointments as reminded, returning the ids that were not already marked"""
+    claimed = set()
+    sent_at = datetime.now(timezone.utc).isoformat()
+    for index in range(0, len(appointment_ids), CLAIM_CHUNK_SIZE):
+        chunk = appointment_ids[index:index + CLAIM_CHUNK_SIZE]
+        result = supabase.table('appointments').update({'reminder_sent_at': sent_at}).in_('id', chunk).is_('reminder_sent_at', 'null').execute()
+        claimed.update(row['id'] for row in result.data)
+    return claimed
+
+def release_reminders(supabase, appointment_ids):
+    """Undo claim_reminders for appointments whose emails could not be queued"""
+    for index in range(0, len(appointment_ids), CLAIM_CHUNK_SIZE):
+        chunk = appointment_ids[index:index + CLAIM_CHUNK_SIZE]
+        supabase.table('appointments').update({'reminder_sent_at': None}).in_('id', chunk).execute()
+
+def reminder_payload(apt):
+    """Build the send_appointment_reminder arguments for an appointment row"""
+    customer = apt.get('customers') or {}
+    return {
+        'appointment_data': {
+            'service_name': (apt.get('services') or {}).get('name', ''),
+            'date': apt['appointment_date'],
+            'time': apt['appointment_time'][:5]
+        },
+        'business_data': apt.get('businesses') or {},
+        'customer_data': {'name': customer.get('name', ''), 'email': customer.get('email')}
+    }
+
+def send_due_reminders(supabase, now=None):
+    """Queue reminders for every appointment starting within the lead time; returns how many"""
+    now = now or datetime.now()
+    appointments = fetch_upcoming_appointments(supabase, now, now + timedelta(hours=Config.REMINDER_LEAD_HOURS))
+
+    queued = 0
+    for business_id, business_appointments in group_by_business(appointments).items():
+        # Appointments without a customer email are claimed too so they are not retried every run
+        claimed = claim_reminders(supabase, [apt['id'] for apt in business_appointments])
+        payloads = [
+            reminder_payload(apt) for apt in business_appointments
+            if apt['id'] in claimed and (apt.get('customers') or {}).get('email')
+        ]
+        try:
+            enqueue_emails('appointment_reminder', payloads)
+        except Exception as e:
+            logger.error(f"Failed to queue reminders for business {business_id}: {e}")
+            release_reminders(supabase, list(claimed))
+            continue
+        queued += len(payloads)
+
+    if queued:
+        logger.info(f"Queued {queued} appointment reminders")
+    return queued
+
+class ReminderScheduler:
+    """Background thread running send_due_reminders every interval seconds"""
+
+    def __init__(self, supabase, interval):
+        self.supabase = supabase
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the scheduler thread"""
+        self._thread = threading.Thread(target=self._run, name='reminder-scheduler', daemon=True)
+        self._thread.start()
+        logger.info(f"Reminder scheduler running every {self.interval} seconds")
+
+    def stop(self, timeout=None):
+        """Stop the scheduler after its current run"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                send_due_reminders(self.supabase)
+            except Exception as e:
+                logger.error(f"Reminder run failed: {e}")
+            self._stop.wait(self.interval)
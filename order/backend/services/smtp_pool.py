@@ -0,0 +1,84 @@
+import time
+import smtplib
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Errors that mean the connection itself is gone (server closed an idle
+# connection, network reset) rather than the message being rejected
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+class SMTPConnectionPool:
+    """Keeps a few authenticated SMTP connections open and reuses them across messages.
+
+    connect is a callable returning a connected, logged-in smtplib.SMTP (such
+    as redmail's EmailSender.get_server). At most size messages are sent at
+    once; idle connections are reused newest first, replaced once they have
+    been idle for max_idle_seconds or have sent max_messages, and a message
+    whose connection turns out to be dead is retried once on a new one.
+    """
+
+    def __init__(self, connect, size=2, max_idle_seconds=60, max_messages=100):
+        self.connect = connect
+        self.max_idle_seconds = max_idle_seconds
+        self.max_messages = max_messages
+        self._idle = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def send_message(self, msg):
+        """Send an EmailMessage on a pooled connection"""
+        with self._slots:
+            connection, sent = self._acquire()
+            try:
+                connection.send_message(msg)
+            except CONNECTION_ERRORS as e:
+                logger.info(f"SMTP connection lost ({e}), reconnecting")
+                self._discard(connection)
+                connection, sent = self.connect(), 0
+                try:
+                    connection.send_message(msg)
+                except Exception:
+                    self._discard(connection)
+                    raise
+            except Exception:
+                # The server may be mid-transaction after a rejected message; start fresh next time
+                self._discard(connection)
+                raise
+            self._release(connection, sent + 1)
+
+    def close(self):
+        """Close every idle connection"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection, _, _ in idle:
+            self._discard(connection)
+
+    def _acquire(self):
+        now = time.monotonic()
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                connection, last_used, sent = self._idle.pop()
+            if now - last_used < self.max_idle_seconds:
+                return connection, sent
+            self._discard(connection)
+        return self.connect(), 0
+
+    def _release(self, connection, sent):
+        if sent >= self.max_messages:
+            self._discard(connection)
+            return
+        with self._lock:
+            self._idle.append((connection, time.monotonic(), sent))
+
+    def _discard(self, connection):
+        try:
+            connection.quit()
+        except Exception:
+            try:
+                connection.close()
+            except Exception:
+                pass
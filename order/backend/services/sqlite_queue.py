@@ -0,0 +1,99 @@
+import os
+import time
+import random
+import sqlite3
+from contextlib import contextmanager
+
+# Shared plumbing for the local SQLite job queues (email outbox, QR jobs).
+# Each queue is a table of rows with status, attempts, next_attempt_at and
+# claimed_at columns:
+#
+#   pending --claim--> <claimed status> --success--> done/sent
+#      ^                     |
+#      +---- retry backoff --+--- out of attempts --> failed
+#
+# Rows left in the claimed status past the claim timeout (the worker died)
+# are claimable again. Subclasses create their tables and add the
+# enqueue/finish methods specific to their jobs.
+
+def retry_schedule(attempts, max_attempts, base_seconds, max_seconds):
+    """Return (status, next_attempt_at) for a job that just failed its attempts-th try"""
+    now = time.time()
+    if attempts >= max_attempts:
+        return 'failed', now
+    delay = min(base_seconds * 2 ** (attempts - 1), max_seconds)
+    # Jitter spreads out retries when many jobs failed together (e.g. an outage)
+    return 'pending', now + delay * random.uniform(0.9, 1.1)
+
+class SQLiteQueue:
+    """Base class for SQLite-backed job queues, safe to share between threads and processes"""
+
+    table = None
+    key_column = 'id'
+    claimed_status = 'running'
+    # Due rows are claimed in this order
+    claim_order = 'next_attempt_at'
+
+    def __init__(self, path):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            self.create_tables(conn)
+
+    def create_tables(self, conn):
+        """Create the queue's tables and indexes if missing"""
+        raise NotImplementedError
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per operation keeps threads and gunicorn workers independent
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front so two workers never claim the same row
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield conn
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+
+    def _claim_rows(self, limit, claim_timeout_seconds):
+        """Mark up to limit due rows as claimed and return them as dicts with their new attempt count"""
+        now = time.time()
+        with self._transaction() as conn:
+            rows = conn.execute(
+                f"""SELECT * FROM {self.table}
+                    WHERE (status = 'pending' AND next_attempt_at <= ?)
+                       OR (status = ? AND claimed_at <= ?)
+                    ORDER BY {self.claim_order} LIMIT ?""",
+                (now, self.claimed_status, now - claim_timeout_seconds, limit)
+            ).fetchall()
+            for row in rows:
+                conn.execute(
+                    f"UPDATE {self.table} SET status = ?, claimed_at = ?, attempts = attempts + 1, updated_at = ? WHERE {self.key_column} = ?",
+                    (self.claimed_status, now, now, row[self.key_column])
+                )
+
+        jobs = []
+        for row in rows:
+            job = dict(row)
+            job['attempts'] += 1
+            jobs.append(job)
+        return jobs
+
+    def counts(self):
+        """Return {status: number of rows} for monitoring"""
+        with self._connect() as conn:
+            rows = conn.execute(f'SELECT status, COUNT(*) AS total FROM {self.table} GROUP BY status').fetchall()
+        return {row['status']: row['total'] for row in rows}
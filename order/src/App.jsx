@@ -1,4 +1,4 @@
-import { useState, useEffect, useCallback } from 'react'
+import { useState, useEffect, useCallback, useRef } from 'react'
 import { BrowserRouter as Router, Routes, Route, Navigate } from 'react-router-dom'
 import BusinessManagement from './pages/BusinessManagement'
 import AdminLogin from './pages/AdminLogin'
@@ -16,6 +16,7 @@ function App() {
   const [currentUser, setCurrentUser] = useState(null)
   const [businesses, setBusinesses] = useState([])
   const [appointments, setAppointments] = useState([])
+  const appointmentsCursor = useRef(null)
   const [loading, setLoading] = useState(true)
 
   // Load businesses on component mount
@@ -94,8 +95,20 @@ function App() {
     if (!currentUser) return
 
     try {
-      const appointmentsData = await apiService.getBusinessAppointments(currentUser.id)
-      setAppointments(appointmentsData)
+      // First load fetches everything, later loads only what changed since the cursor
+      const changes = await apiService.getBusinessAppointmentChanges(currentUser.id, appointmentsCursor.current || '')
+      if (appointmentsCursor.current) {
+        // Rows changed at the cursor's timestamp come back on every poll; merging by id makes that harmless
+        const deletedIds = new Set(changes.deleted)
+        const changedIds = new Set(changes.appointments.map(appointment => appointment.id))
+        setAppointments(prev => [
+          ...prev.filter(appointment => !deletedIds.has(appointment.id) && !changedIds.has(appointment.id)),
+          ...changes.appointments
+        ])
+      } else {
+        setAppointments(changes.appointments)
+      }
+      appointmentsCursor.current = changes.cursor
     } catch (error) {
       console.error('Failed to load appointments:', error)
     }
@@ -103,20 +116,50 @@ function App() {
 
   // Load appointments when user changes
   useEffect(() => {
+    appointmentsCursor.current = null
     if (currentUser) {
       loadAppointments()
     }
   }, [currentUser, loadAppointments])
 
-  // Auto-refresh appointments every 2 minutes
+  // Live appointment updates: the server pushes an event on every change and we
+  // pull the delta. Falls back to refreshing every 2 minutes if the stream fails.
   useEffect(() => {
     if (!currentUser) return
 
-    const interval = setInterval(() => {
+    let interval = null
+    const startPolling = () => {
+      if (!interval) {
+        interval = setInterval(() => {
+          loadAppointments()
+        }, 2 * 60 * 1000) // 2 minutes
+      }
+    }
+
+    if (typeof EventSource === 'undefined') {
+      startPolling()
+      return () => clearInterval(interval)
+    }
+
+    const events = new EventSource(apiService.getBusinessEventsUrl(currentUser.id))
+    const refresh = () => loadAppointments()
+    const eventTypes = ['appointment_created', 'appointment_updated', 'appointment_deleted']
+    eventTypes.forEach(type => events.addEventListener(type, refresh))
+    events.onopen = () => {
+      if (interval) {
+        clearInterval(interval)
+        interval = null
+      }
+      // Catch up on anything that changed while the stream was reconnecting
       loadAppointments()
-    }, 2 * 60 * 1000) // 2 minutes
+    }
+    // Also reached when the server is at its stream limit (503); EventSource then stops and polling takes over
+    events.onerror = () => startPolling()
 
-    return () => clearInterval(interval)
+    return () => {
+      events.close()
+      if (interval) clearInterval(interval)
+    }
   }, [currentUser, loadAppointments])
 
   const updateBusinessProfile = async (businessId, updates) => {
@@ -82,6 +82,7 @@ const BusinessBookingPage = ({ onBookAppointment }) => {
   const [selectedService, setSelectedService] = useState(null);
   const [selectedDate, setSelectedDate] = useState(() => new Date());
   const [selectedTime, setSelectedTime] = useState('');
+  const [slotHold, setSlotHold] = useState(null);
 
   const [customerInfo, setCustomerInfo] = useState({ name: '', email: '', phone: '' });
 
@@ -168,7 +169,7 @@ const BusinessBookingPage = ({ onBookAppointment }) => {
       if (business?.id && apiDate) {
         try {
           setSlotsLoading(true);
-          const availabilityData = await apiService.getAvailableSlots(business.id, apiDate);
+          const availabilityData = await apiService.getAvailableSlots(business.id, apiDate, selectedService?.id);
           setAvailableSlots(availabilityData.available_slots || []);
         } catch (error) {
           setAvailableSlots([]);
@@ -180,7 +181,7 @@ const BusinessBookingPage = ({ onBookAppointment }) => {
       }
     };
     fetchAvailableSlots();
-  }, [business?.id, apiDate]);
+  }, [business?.id, apiDate, selectedService?.id]);
 
   // Also load available slots when calendar date changes
   useEffect(() => {
@@ -190,7 +191,7 @@ const BusinessBookingPage = ({ onBookAppointment }) => {
       const fetchSlotsForCalendarDate = async () => {
         try {
           setSlotsLoading(true);
-          const availabilityData = await apiService.getAvailableSlots(business.id, calendarDateString);
+          const availabilityData = await apiService.getAvailableSlots(business.id, calendarDateString, selectedService?.id);
           setAvailableSlots(availabilityData.available_slots || []);
         } catch (error) {
           setAvailableSlots([]);
@@ -201,7 +202,37 @@ const BusinessBookingPage = ({ onBookAppointment }) => {
       
       fetchSlotsForCalendarDate();
     }
-  }, [selectedCalendarDate, business?.id]);
+  }, [selectedCalendarDate, business?.id, selectedService?.id]);
+
+  const refreshAvailableSlots = async () => {
+    try {
+      const availabilityData = await apiService.getAvailableSlots(business.id, apiDate, selectedService?.id);
+      setAvailableSlots(availabilityData.available_slots || []);
+    } catch (error) {
+      // Silently handle refresh errors
+    }
+  };
+
+  // Hold the picked slot so nobody else can book it while the form is filled in
+  const handleSelectTime = async (time) => {
+    setSelectedTime(time);
+    if (slotHold) {
+      setSlotHold(null);
+      // Released first so the previous hold can't overlap (and block) the new one
+      await apiService.releaseSlotHold(slotHold.id).catch(() => {});
+    }
+    try {
+      const hold = await apiService.holdSlot(business.id, apiDate, time, selectedService?.id);
+      setSlotHold(hold);
+    } catch (err) {
+      if (err.status === 409) {
+        setSelectedTime('');
+        showError(err.message);
+        refreshAvailableSlots();
+      }
+      // Any other failure leaves the slot unheld; booking still checks it
+    }
+  };
 
   const handleBookAppointment = async (e) => {
     e.preventDefault();
@@ -230,6 +261,7 @@ const BusinessBookingPage = ({ onBookAppointment }) => {
         customer_phone: customerInfo.phone,
         send_email_confirmation: true,
         status: 'confirmed',
+        ...(slotHold ? { hold_id: slotHold.id } : {}),
       };
 
       await onBookAppointment(appointment);
@@ -254,7 +286,7 @@ const BusinessBookingPage = ({ onBookAppointment }) => {
       try {
         const [refreshedBookings, refreshedAvailability] = await Promise.all([
           apiService.getBookingsForBusiness(business.id, apiDate),
-          apiService.getAvailableSlots(business.id, apiDate)
+          apiService.getAvailableSlots(business.id, apiDate, selectedService?.id)
         ]);
         setBookings(Array.isArray(refreshedBookings) ? refreshedBookings : []);
         setAvailableSlots(refreshedAvailability.available_slots || []);
@@ -265,9 +297,18 @@ const BusinessBookingPage = ({ onBookAppointment }) => {
       // reset fields (keep date)
       setSelectedService(null);
       setSelectedTime('');
+      setSlotHold(null);
       setCustomerInfo({ name: '', email: '', phone: '' });
 
     } catch (err) {
+      if (err.status === 409) {
+        // Someone else booked the slot first
+        setSelectedTime('');
+        setSlotHold(null);
+        showError(err.message);
+        refreshAvailableSlots();
+        return;
+      }
       showError('Failed to book appointment. Please try again.');
     } finally {
       setSubmitting(false);
@@ -541,7 +582,7 @@ const BusinessBookingPage = ({ onBookAppointment }) => {
                             {timesForDate.map((time, index) => (
                               <button
                                 key={index}
-                                onClick={() => setSelectedTime(time)}
+                                onClick={() => handleSelectTime(time)}
                                 className={`p-3 rounded-lg border-2 text-sm font-medium transition-all duration-200 ${
                                   selectedTime === time
                                     ? 'border-blue-500 bg-blue-50 text-blue-700 ring-2 ring-blue-200'
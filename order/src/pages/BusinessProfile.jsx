@@ -14,7 +14,8 @@ const BusinessProfile = ({ business, onUpdateProfile }) => {
     description: business?.description || '',
     address: business?.address || '',
     phone: business?.phone || '',
-    email: business?.email || ''
+    email: business?.email || '',
+    notification_digest_minutes: business?.notification_digest_minutes || 0
   })
 
   const getBusinessUrl = (business) => {
@@ -35,7 +36,8 @@ const BusinessProfile = ({ business, onUpdateProfile }) => {
         description: business.description || '',
         address: business.address || '',
         phone: business.phone || '',
-        email: business.email || ''
+        email: business.email || '',
+        notification_digest_minutes: business.notification_digest_minutes || 0
       })
     }
   }, [business])
@@ -47,10 +49,17 @@ const BusinessProfile = ({ business, onUpdateProfile }) => {
     }))
   }
 
+  // Only offered once the notification_digest_minutes column has been migrated
+  const supportsDigest = business && 'notification_digest_minutes' in business
+
   const handleSave = async () => {
     setLoading(true)
     try {
-      const updatedBusiness = await apiService.updateBusiness(business.id, businessData)
+      const updates = { ...businessData }
+      if (!supportsDigest) {
+        delete updates.notification_digest_minutes
+      }
+      const updatedBusiness = await apiService.updateBusiness(business.id, updates)
       onUpdateProfile(updatedBusiness)
       showSuccess('Profile updated successfully')
     } catch (error) {
@@ -69,7 +78,8 @@ const BusinessProfile = ({ business, onUpdateProfile }) => {
       description: business?.description || '',
       address: business?.address || '',
       phone: business?.phone || '',
-      email: business?.email || ''
+      email: business?.email || '',
+      notification_digest_minutes: business?.notification_digest_minutes || 0
     })
   }
 
@@ -210,6 +220,22 @@ const BusinessProfile = ({ business, onUpdateProfile }) => {
               className="w-full px-3 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-blue-500 font-light"
             />
           </div>
+
+          {supportsDigest && (
+            <div className="sm:col-span-2">
+              <label className="block text-sm font-light text-gray-700 mb-2">New Booking Emails</label>
+              <select
+                value={businessData.notification_digest_minutes}
+                onChange={(e) => handleInputChange('notification_digest_minutes', Number(e.target.value))}
+                className="w-full px-3 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-blue-500 font-light"
+              >
+                <option value={0}>One email per booking</option>
+                <option value={60}>Hourly summary</option>
+                <option value={240}>Summary every 4 hours</option>
+                <option value={1440}>Daily summary</option>
+              </select>
+            </div>
+          )}
         </div>
 
         <div className="mt-6 flex flex-col sm:flex-row sm:justify-end space-y-3 sm:space-y-0 sm:space-x-3">
@@ -35,7 +35,9 @@ class ApiService {
           statusText: response.statusText,
           data: data
         });
-        throw new Error(data.error || `HTTP ${response.status}: ${response.statusText}`);
+        const error = new Error(data.error || `HTTP ${response.status}: ${response.statusText}`);
+        error.status = response.status;
+        throw error;
       }
       
       return data;
@@ -49,9 +51,22 @@ class ApiService {
     }
   }
 
+  // Follow next_cursor through a paginated list endpoint and return every row
+  async requestAllPages(endpoint) {
+    const rows = [];
+    let after = '';
+    do {
+      const params = new URLSearchParams(after ? { after } : {});
+      const page = await this.request(`${endpoint}?${params}`);
+      rows.push(...page.data);
+      after = page.next_cursor;
+    } while (after);
+    return rows;
+  }
+
   // Business endpoints
   async getAllBusinesses() {
-    return this.request('/businesses');
+    return this.requestAllPages('/businesses');
   }
 
   async getBusinessBySlug(slug) {
@@ -120,7 +135,16 @@ class ApiService {
 
   // Appointment endpoints
   async getBusinessAppointments(businessId) {
-    return this.request(`/appointments/business/${businessId}`);
+    return this.requestAllPages(`/appointments/business/${businessId}`);
+  }
+
+  async getBusinessAppointmentChanges(businessId, cursor = '') {
+    const params = new URLSearchParams({ since: cursor });
+    return this.request(`/appointments/business/${businessId}?${params}`);
+  }
+
+  getBusinessEventsUrl(businessId) {
+    return `${API_BASE_URL}/appointments/business/${businessId}/events`;
   }
 
   async getAppointment(appointmentId, businessId) {
@@ -135,6 +159,20 @@ class ApiService {
     });
   }
 
+  // Reserve a time slot while the customer fills in the booking form
+  async holdSlot(businessId, date, time, serviceId) {
+    return this.request('/appointments/holds', {
+      method: 'POST',
+      body: JSON.stringify({ business_id: businessId, date, time, service_id: serviceId }),
+    });
+  }
+
+  async releaseSlotHold(holdId) {
+    return this.request(`/appointments/holds/${holdId}`, {
+      method: 'DELETE',
+    });
+  }
+
   async updateAppointment(appointmentId, businessId, updates) {
     return this.request(`/appointments/${appointmentId}?business_id=${businessId}`, {
       method: 'PUT',
@@ -215,15 +253,20 @@ class ApiService {
   }
 
   // Availability endpoints
-  async getAvailableSlots(businessId, date) {
-    return this.request(`/availability/business/${businessId}/date/${date}`);
+  // Pass serviceId to only get start times with room for that service's duration
+  async getAvailableSlots(businessId, date, serviceId = null) {
+    const query = serviceId ? `?service_id=${serviceId}` : '';
+    return this.request(`/availability/business/${businessId}/date/${date}${query}`);
   }
 
-  async getAvailableSlotsRange(businessId, startDate, endDate) {
+  async getAvailableSlotsRange(businessId, startDate, endDate, serviceId = null) {
     const params = new URLSearchParams({
       start_date: startDate,
       end_date: endDate,
     });
+    if (serviceId) {
+      params.set('service_id', serviceId);
+    }
     return this.request(`/availability/business/${businessId}/range?${params}`);
   }
 